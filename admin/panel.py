@@ -4,6 +4,7 @@
 This module defines the main AdminPanel class that brings all the admin tabs together.
 """
 
+from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTabWidget
 
 from admin.tabs.chat_tester_tab import ChatTesterTab
@@ -14,6 +15,10 @@ from admin.tabs.system_stats_tab import SystemStatsTab
 from admin.tabs.log_viewer_tab import LogViewerTab
 
 class AdminPanel(QWidget):
+    # Emitted from the history worker thread with the load generation, a list
+    # of (sender, message) tuples to display and the (role, text) turns to restore
+    history_chunk_ready = pyqtSignal(int, list, list)
+
     def apply_dark_mode(self, enabled):
         if enabled:
             # Simple dark theme stylesheet
@@ -71,8 +76,15 @@ class AdminPanel(QWidget):
         self.tabs.addTab(self.log_viewer_tab, "Log Viewer")
         self.tabs.addTab(self.settings_tab, "Settings")
 
+        self.history_chunk_ready.connect(self._apply_history_chunk)
+
         self.setLayout(layout)
 
+    def _apply_history_chunk(self, generation, messages, turns):
+        """Restores and displays a chunk of a loaded session, unless a newer load has started."""
+        if self.app_instance.restore_history(generation, turns):
+            self.chat_tester_tab.append_history_chunk(messages)
+
     def display_message(self, sender, message):
         """Delegate method to display a message in the chat tester tab."""
         self.chat_tester_tab.display_message(sender, message)
@@ -6,15 +6,22 @@ from PyQt6.QtWidgets import (
     QLabel, QMessageBox, QMenu, QComboBox, QCheckBox,
     QFileDialog, QDialog, QInputDialog
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QPixmap, QTextCursor
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import json
+from utils import json_utils
+from utils.logger import get_logger
 import os
 import subprocess
 import sys
 
+logger = get_logger(__name__)
+
 class ChatTesterTab(QWidget):
+    # Emitted from the chat worker thread with the result of process_input
+    response_ready = pyqtSignal(dict)
+
     def contextMenuEvent(self, event):
         menu = QMenu(self)
         menu.addAction("Copy")
@@ -72,6 +79,9 @@ class ChatTesterTab(QWidget):
         self.config = app_instance.config
         self.conversation_log = []
         self.current_theme = "light"
+        # Messages are processed off the GUI thread, one at a time and in order
+        self._chat_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat')
+        self.response_ready.connect(self.show_response)
         self.init_ui()
 
     def init_ui(self):
@@ -170,8 +180,17 @@ class ChatTesterTab(QWidget):
 
         self.display_message("User", user_input)
         self.input_field.clear()
+        self._chat_executor.submit(self._process_message, user_input)
+
+    def _process_message(self, user_input):
+        try:
+            response_data = self.app_instance.process_input(user_input)
+        except Exception as e:
+            logger.error(f"Failed to process chat message: {e}", exc_info=True)
+            response_data = {}
+        self.response_ready.emit(response_data)
 
-        response_data = self.app_instance.process_input(user_input)
+    def show_response(self, response_data):
         response = response_data.get("response", "Sorry, something went wrong.")
         confidence = response_data.get("confidence", 0.0)
         intent = response_data.get("intent", "unknown")
@@ -186,6 +205,23 @@ class ChatTesterTab(QWidget):
         self.conversation_log.append({"time": timestamp, "sender": sender, "text": message})
         self.chat_display.verticalScrollBar().setValue(self.chat_display.verticalScrollBar().maximum())
 
+    def append_history_chunk(self, messages):
+        """Appends a batch of (sender, message) tuples in a single edit block."""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        document = self.chat_display.document()
+        needs_new_block = not document.isEmpty()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        for sender, message in messages:
+            if needs_new_block:
+                cursor.insertBlock()
+            cursor.insertHtml(f"[{timestamp}] <b>{sender}:</b> {message}")
+            needs_new_block = True
+            self.conversation_log.append({"time": timestamp, "sender": sender, "text": message})
+        cursor.endEditBlock()
+        self.chat_display.verticalScrollBar().setValue(self.chat_display.verticalScrollBar().maximum())
+
     def clear_chat(self):
         self.chat_display.clear()
         self.conversation_log.clear()
@@ -204,7 +240,7 @@ class ChatTesterTab(QWidget):
         self.app_instance.load_history(session_name=session_name)
 
     def create_new_session(self):
-        session_name = datetime.now().strftime('session_%Y%m%d_%H%M%S.json')
+        session_name = datetime.now().strftime('session_%Y%m%d_%H%M%S.jsonl')
         self.app_instance.save_history(session_name=session_name)
         self.refresh_sessions_sidebar()
         self.app_instance.load_history(session_name=session_name)
@@ -238,7 +274,9 @@ class ChatTesterTab(QWidget):
                 self.display_message("Bot", f"Loading '{new_model}' model. Please wait...")
                 def load_model_thread():
                     loaded = self.app_instance.intent_classifier.load_model()
+                    self.app_instance.clear_prediction_cache()
                     if loaded:
+                        self.app_instance.rebuild_pattern_index()
                         self.display_message("Bot", f"Switched to '{new_model}' model and loaded existing weights.")
                     else:
                         self.display_message("Bot", f"Model files for '{new_model}' not found. Please retrain manually.")
@@ -280,8 +318,8 @@ class ChatTesterTab(QWidget):
         filename, _ = QFileDialog.getSaveFileName(self, "Export Chat (JSON)", "chat_export.json", "JSON Files (*.json)")
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(self.conversation_log, f, indent=4)
+                with open(filename, 'wb') as f:
+                    f.write(json_utils.dumps_bytes(self.conversation_log, indent=True))
                 QMessageBox.information(self, "Export Successful", f"Chat exported to {filename}")
             except Exception as e:
                 QMessageBox.critical(self, "Export Failed", str(e))
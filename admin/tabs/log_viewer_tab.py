@@ -47,7 +47,10 @@ class LogViewerTab(QWidget):
         """
         if not os.path.exists(self.log_dir):
             return []
-        return sorted([f for f in os.listdir(self.log_dir) if f.endswith('.log')])
+        with os.scandir(self.log_dir) as entries:
+            names = [e.name for e in entries if e.name.endswith('.log') and e.is_file()]
+        names.sort()
+        return names
 
     def init_ui(self):
         """Initializes the UI components of the tab."""
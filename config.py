@@ -5,6 +5,9 @@
 # ==============================================================================
 import os
 
+# Environment values accepted as true by Config._get_bool_env
+_TRUE_VALUES = frozenset({'1', 'true', 'yes', 'on'})
+
 class Config:
     # ==================== UI CONFIG ====================
     DARK_MODE = False
@@ -27,6 +30,12 @@ class Config:
     USE_LOWERCASE = True
     USE_STOPWORD_REMOVAL = True
     USE_LEMMATIZATION = True
+    # Number of distinct tokens whose normalized form is memoized
+    TOKEN_CACHE_SIZE = 50000
+    # Number of distinct texts whose BERT token ids are cached
+    ENCODING_CACHE_SIZE = 4096
+    # Number of distinct texts whose SVM prediction scores are cached
+    SVM_SCORE_CACHE_SIZE = 1024
     
     CUSTOM_STOPWORDS = {"a", "an", "the", "is", "are", "i", "you", "am"}
 
@@ -43,14 +52,56 @@ class Config:
     # Confidence threshold for intent classification
     # Responses below this threshold will trigger fallback behavior
     CONFIDENCE_THRESHOLD = 0.5  # 50% confidence required
+    # Low-confidence inputs are mapped to the intent of the most similar
+    # training pattern when their cosine similarity reaches this value
+    ENABLE_PATTERN_MATCH = True
+    PATTERN_MATCH_THRESHOLD = 0.85
     
     # BERT-specific parameters
     BERT_BATCH_SIZE = 16
     BERT_EPOCHS = 5
     BERT_LEARNING_RATE = 1e-5
+    # DataLoader worker processes for BERT training. Batches are slices of
+    # pre-tokenized tensors, so 0 (load in the training process) is usually fastest
+    BERT_DATALOADER_WORKERS = 0
+    # Train with bf16/fp16 autocast when a CUDA device is available
+    BERT_MIXED_PRECISION = True
+    # Fraction of BERT attention heads pruned after training, least important
+    # first (0 disables pruning)
+    BERT_PRUNE_HEADS_RATIO = 0.0
+    # Use bitsandbytes' 8-bit AdamW for BERT training on CUDA (if installed)
+    USE_8BIT_OPTIM = False
+    # Apply dynamic int8 quantization to the loaded BERT model (CPU inference only).
+    # Training also saves the quantized weights so CPU starts load them directly.
+    QUANTIZE_INT8 = True
+    # Cast the loaded BERT model to bfloat16 when int8 quantization is not applied
+    # (GPU inference, or QUANTIZE_INT8 disabled on CPUs with native bf16 support)
+    USE_BF16 = False
+    # Export a traced TorchScript model after BERT training and prefer it at load
+    # time. The traced model only predicts intents, so pattern matching is off.
+    USE_TORCHSCRIPT = False
+    # Compile the loaded BERT model (torch.compile, or TorchScript on older PyTorch)
+    COMPILE_MODEL = False
+    # Compiled kernels are cached here so later starts skip recompilation
+    TORCH_COMPILE_CACHE_DIR = os.path.join(BASE_DIR, '.torch_compile_cache')
+    
+    # Micro-batching of concurrent intent predictions
+    INTENT_BATCH_SIZE = 16
+    INTENT_BATCH_WAIT_MS = 5
+    
+    # Maximum number of cached intent predictions for repeated inputs
+    PREDICTION_CACHE_SIZE = 10000
+    # Number of most frequent training patterns predicted into the cache at startup (0 disables)
+    PREDICTION_CACHE_PREWARM_SIZE = 5000
     
     # Context Handler
     CONTEXT_WINDOW_SIZE = 3
+    # Maximum number of API users whose conversation context is kept in memory
+    MAX_USER_SESSIONS = 10000
+    # Number of evicted context handlers kept for reuse
+    SESSION_POOL_SIZE = 256
+    # Number of history messages handed to the GUI per batch when loading a session
+    HISTORY_CHUNK_SIZE = 50
     
     # Enable generative model response hook
     ENABLE_GENERATIVE_RESPONSE = False
@@ -60,6 +111,9 @@ class Config:
     GOOGLE_MAX_RESULTS = 5
     # Cache duration for Google search results (in seconds)
     GOOGLE_CACHE_DURATION = 3600
+    # Seconds to wait for a Google fallback search, retries included, before
+    # answering with a default response
+    GOOGLE_FALLBACK_TIMEOUT = 10
 
     # ==================== GUI CONFIG ====================
     GUI_WIDTH = 400
@@ -106,18 +160,45 @@ class Config:
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", self.LOG_LEVEL)
         self.BERT_MODEL_PATH = os.getenv("BERT_MODEL_PATH", self.BERT_MODEL_PATH)
         self.CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", self.CONFIDENCE_THRESHOLD))
+        self.ENABLE_PATTERN_MATCH = self._get_bool_env("ENABLE_PATTERN_MATCH", self.ENABLE_PATTERN_MATCH)
+        self.PATTERN_MATCH_THRESHOLD = float(os.getenv("PATTERN_MATCH_THRESHOLD", self.PATTERN_MATCH_THRESHOLD))
         self.BERT_BATCH_SIZE = int(os.getenv("BERT_BATCH_SIZE", self.BERT_BATCH_SIZE))
         self.BERT_EPOCHS = int(os.getenv("BERT_EPOCHS", self.BERT_EPOCHS))
         self.BERT_LEARNING_RATE = float(os.getenv("BERT_LEARNING_RATE", self.BERT_LEARNING_RATE))
+        self.BERT_DATALOADER_WORKERS = int(os.getenv("BERT_DATALOADER_WORKERS", self.BERT_DATALOADER_WORKERS))
+        self.BERT_MIXED_PRECISION = self._get_bool_env("BERT_MIXED_PRECISION", self.BERT_MIXED_PRECISION)
+        self.BERT_PRUNE_HEADS_RATIO = float(os.getenv("BERT_PRUNE_HEADS_RATIO", self.BERT_PRUNE_HEADS_RATIO))
+        self.USE_8BIT_OPTIM = self._get_bool_env("USE_8BIT_OPTIM", self.USE_8BIT_OPTIM)
+        self.QUANTIZE_INT8 = self._get_bool_env("QUANTIZE_INT8", self.QUANTIZE_INT8)
+        self.USE_BF16 = self._get_bool_env("USE_BF16", self.USE_BF16)
+        self.USE_TORCHSCRIPT = self._get_bool_env("USE_TORCHSCRIPT", self.USE_TORCHSCRIPT)
+        self.COMPILE_MODEL = self._get_bool_env("COMPILE_MODEL", self.COMPILE_MODEL)
+        self.INTENT_BATCH_SIZE = int(os.getenv("INTENT_BATCH_SIZE", self.INTENT_BATCH_SIZE))
+        self.INTENT_BATCH_WAIT_MS = float(os.getenv("INTENT_BATCH_WAIT_MS", self.INTENT_BATCH_WAIT_MS))
         # Optional override for intents directory
         self.INTENTS_DIR = os.getenv("INTENTS_DIR", self.INTENTS_DIR)
+        # Upper bound on in-memory API user contexts (least recently used are evicted)
+        self.MAX_USER_SESSIONS = int(os.getenv("MAX_USER_SESSIONS", self.MAX_USER_SESSIONS))
+        # Run only the API server, without the admin panel
+        self.HEADLESS = self._get_bool_env("HEADLESS", getattr(self, 'HEADLESS', False))
         # API server
         self.API_HOST = os.getenv("API_HOST", getattr(self, 'API_HOST', '127.0.0.1'))
         self.API_PORT = int(os.getenv("API_PORT", getattr(self, 'API_PORT', 8080)))
+        # Seconds an idle keep-alive connection is held open (0 closes after each response)
+        self.API_KEEPALIVE_TIMEOUT = float(os.getenv("API_KEEPALIVE_TIMEOUT", getattr(self, 'API_KEEPALIVE_TIMEOUT', 5)))
+        # Pending connections the kernel queues for the API listener (capped by net.core.somaxconn)
+        self.API_LISTEN_BACKLOG = int(os.getenv("API_LISTEN_BACKLOG", getattr(self, 'API_LISTEN_BACKLOG', 1024)))
+        # Background writer for API session logs
+        self.API_LOG_QUEUE_SIZE = int(os.getenv("API_LOG_QUEUE_SIZE", getattr(self, 'API_LOG_QUEUE_SIZE', 10000)))
+        self.API_LOG_BATCH_SIZE = int(os.getenv("API_LOG_BATCH_SIZE", getattr(self, 'API_LOG_BATCH_SIZE', 500)))
+        self.API_LOG_FLUSH_INTERVAL_MS = int(os.getenv("API_LOG_FLUSH_INTERVAL_MS", getattr(self, 'API_LOG_FLUSH_INTERVAL_MS', 200)))
+        # Number of API worker processes (1 = single threaded server, 0 = one per spare CPU core)
+        self.API_WORKERS = int(os.getenv("API_WORKERS", getattr(self, 'API_WORKERS', 1)))
         # Allow toggling Google fallback and related settings at runtime
         self.ENABLE_GOOGLE_FALLBACK = self._get_bool_env("ENABLE_GOOGLE_FALLBACK", self.ENABLE_GOOGLE_FALLBACK)
         self.GOOGLE_MAX_RESULTS = int(os.getenv("GOOGLE_MAX_RESULTS", self.GOOGLE_MAX_RESULTS))
         self.GOOGLE_CACHE_DURATION = int(os.getenv("GOOGLE_CACHE_DURATION", self.GOOGLE_CACHE_DURATION))
+        self.GOOGLE_FALLBACK_TIMEOUT = float(os.getenv("GOOGLE_FALLBACK_TIMEOUT", self.GOOGLE_FALLBACK_TIMEOUT))
 
     def __init__(self):
         self.load_from_env()  # Call first to allow overrides
@@ -134,4 +215,4 @@ class Config:
         val = os.getenv(var)
         if val is None:
             return default
-        return val.lower() in ("1", "true", "yes", "on")
\ No newline at end of file
+        return val.strip().casefold() in _TRUE_VALUES
\ No newline at end of file
@@ -5,25 +5,156 @@
 
 import sys
 import json
+import logging
 import os
-import pickle
-import torch
+import signal
+import socket
+import multiprocessing
+import time
+from email.utils import formatdate
+from http import HTTPStatus
 from datetime import datetime
-from PyQt6.QtWidgets import QApplication
 import threading
+import queue
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # Import project modules
 from config import Config
 from utils.logger import get_logger
 from utils.preprocessing import TextPreprocessor
 from utils.data_loader import load_all_intents
+from utils import json_utils
 from model.intent_classifier import IntentClassifier
+from model.intent_batcher import IntentBatcher
+from model.pattern_index import PatternIndex
 from model.response_handler import ResponseHandler
 from model.context_handler import ContextHandler
-from admin.panel import AdminPanel
 from utils.api_key_manager import APIKeyManager
+from utils.database import get_wal_connection
+
+
+# Precomposed status lines and headers for JSON API responses
+_STATUS_LINES = {
+    status.value: f"HTTP/1.1 {status.value} {status.phrase}\r\n".encode('latin-1')
+    for status in HTTPStatus
+}
+_JSON_HEADERS = (
+    b"Content-Type: application/json\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Headers: Content-Type, X-API-Key\r\n"
+    b"Content-Length: "
+)
+_OPTIONS_HEADERS = (
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: POST, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: Content-Type, X-API-Key\r\n"
+    b"\r\n"
+)
+
+_http_date = ""
+_http_date_updated = None
+
+
+def _cached_http_date():
+    """Returns the current HTTP Date header value, reformatted at most once per second."""
+    global _http_date, _http_date_updated
+    now = time.monotonic()
+    if _http_date_updated is None or now - _http_date_updated >= 1.0:
+        _http_date = formatdate(usegmt=True)
+        _http_date_updated = now
+    return _http_date
+
+
+def _date_header():
+    """Returns the Date header line that every response must carry (RFC 7231)."""
+    return b"Date: " + _cached_http_date().encode('latin-1') + b"\r\n"
+
+
+class ReusePortHTTPServer(ThreadingHTTPServer):
+    """
+    HTTPServer that sets SO_REUSEPORT before binding so several worker
+    processes can listen on the same host:port and let the kernel balance
+    incoming connections between them.
+    """
+    def server_bind(self):
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def _create_api_server(server_cls, address, handler_cls, backlog):
+    """
+    Binds an API server with the given listen backlog. socketserver's default
+    of 5 pending connections makes the kernel drop or delay new connections
+    during bursts, before any handler thread has had a chance to accept them.
+    """
+    httpd = server_cls(address, handler_cls, bind_and_activate=False)
+    httpd.request_queue_size = backlog
+    try:
+        httpd.server_bind()
+        httpd.server_activate()
+    except Exception:
+        httpd.server_close()
+        raise
+    return httpd
+
+
+def _serve_api_worker(host, port, handler_cls, backlog, on_exit=None, on_reload=None):
+    """
+    Entry point for a forked API worker process. SIGTERM (sent by
+    stop_api_server) stops serving and runs on_exit before the process exits;
+    SIGHUP (sent after a retrain) runs on_reload on a new thread.
+    """
+    def terminate(signum, frame):
+        # A second SIGTERM must not interrupt on_exit
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        raise SystemExit(0)
+
+    def reload(signum, frame):
+        threading.Thread(target=on_reload, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, terminate)
+    if on_reload is not None:
+        signal.signal(signal.SIGHUP, reload)
+    # Each worker handles one request at a time; keep torch (if the model
+    # uses it) from spawning an intra-op thread pool per process and
+    # oversubscribing the CPU.
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(1)
+    httpd = _create_api_server(ReusePortHTTPServer, (host, port), handler_cls, backlog)
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        if on_exit is not None:
+            on_exit()
+
+
+_EMPTY_INPUT_RESPONSE = "Please type something to start our conversation."
+_PREDICTION_ERROR_RESPONSE = "Sorry, I'm having trouble understanding right now."
+
+
+def _result(response, intent, confidence):
+    """Builds the dictionary returned by ChatbotApp.process_input."""
+    return {"response": response, "intent": intent, "confidence": confidence}
+
+
+def _retrain_worker(config, data, result_queue):
+    """
+    Entry point for the retraining process. Trains a fresh classifier and
+    saves it to disk, then reports the outcome on result_queue.
+    """
+    try:
+        classifier = IntentClassifier(config)
+        classifier.train_model(data, TextPreprocessor(config))
+        result_queue.put((True, None))
+    except Exception as e:
+        get_logger(__name__).error(f"[Retrain] Training process failed: {e}", exc_info=True)
+        result_queue.put((False, str(e)))
+
 
 class ChatbotApp:
     """
@@ -43,18 +174,55 @@ class ChatbotApp:
 
         # Initialize GUI to None before any potential calls to methods that use it
         self.gui = None
+        self._refresh_sessions_sidebar = None
         
         # Initialize Data and Preprocessing
         self.data = self._load_data(self.config.DATA_PATH)
         self.preprocessor = TextPreprocessor(self.config)
         self.context_handler = ContextHandler(self.config.CONTEXT_WINDOW_SIZE)
+        # Per-user contexts for API clients, plus a pool of cleared contexts to reuse
+        self.user_sessions = OrderedDict()
+        self._session_pool = deque(maxlen=self.config.SESSION_POOL_SIZE)
+        self._sessions_lock = threading.Lock()
 
         # Initialize Model Components
         self.intent_classifier = IntentClassifier(self.config)
+        # Resolve the classifier per batch so a retrained model is picked up
+        self.intent_batcher = IntentBatcher(
+            lambda batch: self.intent_classifier.predict_intent_batch(batch),
+            max_batch_size=self.config.INTENT_BATCH_SIZE,
+            max_wait=self.config.INTENT_BATCH_WAIT_MS / 1000.0
+        )
         self.response_handler = ResponseHandler(self.data, self.config)
+        # LRU cache of (intent, confidence) keyed by normalized input text and by preprocessed tokens
+        self._prediction_cache = OrderedDict()
+        self._prediction_cache_lock = threading.Lock()
+        # Embeddings of the training patterns for low-confidence inputs
+        self._pattern_index = None
+        # Cache prewarm and pattern index threads (see _join_warmup_threads)
+        self._warmup_threads = []
         self.api_key_manager = APIKeyManager()
         self._httpd = None
         self._api_thread = None
+        self._api_workers = []
+        self._model_loaded = False
+        # Single worker so session loads are parsed in the order requested
+        self._history_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history')
+        self._history_generation = 0
+        # Session file last saved or loaded, and the context turn count at that point
+        self._saved_session = None
+        self._saved_turns = 0
+        # API session logs are written by a background thread (see log_api_session)
+        self._api_log_lock = threading.Lock()
+        self._api_log_queue = None
+        self._api_log_thread = None
+        self._api_log_pid = None
+        # Held while a retrain is running so overlapping requests are skipped
+        self._retrain_lock = threading.Lock()
+        # Serializes model reloads in API workers (see _reload_model)
+        self._reload_lock = threading.Lock()
+        # Set to stop a headless run (see run and request_shutdown)
+        self._shutdown = threading.Event()
         
         # Database is initialized in the main block
 
@@ -65,26 +233,59 @@ class ChatbotApp:
                 logger.warning("Model files not found. Starting initial training in background.")
                 self.retrain_model(background=True)
             else:
+                self._model_loaded = True
                 logger.info("Model loaded successfully.")
+                if self.config.COMPILE_MODEL:
+                    self.intent_classifier.compile_for_inference()
+                self._warmup(self.intent_classifier)
+                self._start_prediction_cache_prewarm()
+                self.rebuild_pattern_index()
         except Exception as e:
             logger.error(f"Failed to load model: {e}. Retraining in background...")
             self.retrain_model(background=True)
 
-        # Initialize GUI
-        self.app = QApplication(sys.argv)
-        self.gui = AdminPanel(self)
-        self.gui.setWindowTitle(f"{self.config.PROJECT_NAME} v{self.config.VERSION} - Admin Panel")
-        self.gui.show()
-
-        logger.info("Chatbot Application initialized and ready.")
-
-        # Start background API server
+        # Start background API server. This happens before the GUI is created
+        # so that forked API workers never inherit Qt state.
         try:
             self.start_api_server()
             logger.info("Background API server started.")
         except Exception as e:
             logger.error(f"Failed to start API server: {e}")
 
+        self.app = None
+        if not self.config.HEADLESS:
+            self._init_gui()
+
+        logger.info("Chatbot Application initialized and ready.")
+
+    def _warmup(self, classifier):
+        """
+        Runs a sample input through preprocessing and the batched prediction
+        path, so lazily loaded NLTK corpora and the model's kernels are ready
+        before real requests arrive. Called before the API server starts (or
+        before a hot-swap), rather than on a thread, so forked API workers
+        inherit the warmed state and never fork mid-warmup.
+        """
+        try:
+            tokens = self.preprocessor.preprocess("hello world")
+            # Two inputs so the padded multi-row batch path is exercised too
+            classifier.predict_intent_batch([tokens, tokens])
+        except Exception as e:
+            logger.warning(f"Warmup failed: {e}")
+
+    def _init_gui(self):
+        """Creates the Qt application and the admin panel."""
+        # Qt is only imported when the admin panel is shown
+        from PyQt6.QtWidgets import QApplication
+        from admin.panel import AdminPanel
+
+        self.app = QApplication(sys.argv)
+        self.gui = AdminPanel(self)
+        # Optional GUI hook, resolved once instead of on every save
+        self._refresh_sessions_sidebar = getattr(self.gui, 'refresh_sessions_sidebar', None)
+        self.gui.setWindowTitle(f"{self.config.PROJECT_NAME} v{self.config.VERSION} - Admin Panel")
+        self.gui.show()
+
     def _load_data(self, file_path):
         """
         Loads the intents and responses data from the intents directory.
@@ -100,8 +301,8 @@ class ChatbotApp:
             if intents_dir and os.path.isdir(intents_dir):
                 return load_all_intents(intents_dir)
             # Fallback to legacy single file if directory missing
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(file_path, 'rb') as f:
+                return json_utils.loads(f.read())
         except FileNotFoundError:
             logger.error(f"Intents not found in directory or file. Checked dir: {getattr(self.config, 'INTENTS_DIR', None)}, file: {file_path}")
             return {"intents": []}
@@ -109,31 +310,190 @@ class ChatbotApp:
             logger.error(f"Error decoding JSON intents: {e}")
             return {"intents": []}
             
-    def process_input(self, user_input):
+    def process_input(self, user_input, user_id=None):
         """
         Handles user input, processes it, and generates a response.
         
         Args:
             user_input (str): The raw text input from the user.
+            user_id (str, optional): API user the input belongs to. When omitted,
+                the admin panel's own conversation context is used.
         
         Returns:
             dict: A dictionary containing the response and other metadata.
         """
-        if not user_input.strip():
-            return {"response": "Please type something to start our conversation.", "intent": "none", "confidence": 1.0}
+        stripped = user_input.strip()
+        if not stripped:
+            return _result(_EMPTY_INPUT_RESPONSE, "none", 1.0)
+
+        context_handler = self.context_handler if user_id is None else self.get_or_create_session(user_id)
+        context_handler.add_user_query(user_input)
+        # The threshold is part of the key because it decides 'no_match'
+        cache_key = (stripped.lower(), self.config.CONFIDENCE_THRESHOLD)
+        cached = self._get_cached_prediction(cache_key)
+        if cached is not None:
+            predicted_intent, confidence = cached
+        else:
+            preprocessed_text = self.preprocessor.preprocess(user_input)
+            # Differently worded inputs often preprocess to the same tokens
+            # ("Hello!" and "hello"), so predictions are cached by those too
+            token_key = (tuple(preprocessed_text), self.config.CONFIDENCE_THRESHOLD)
+            cached = self._get_cached_prediction(token_key)
+            if cached is not None:
+                predicted_intent, confidence = cached
+            else:
+                try:
+                    predicted_intent, confidence = self.intent_batcher.predict_intent(preprocessed_text)
+                except Exception as e:
+                    logger.error(f"Prediction error: {e}")
+                    return _result(_PREDICTION_ERROR_RESPONSE, "error", 0.0)
+                if predicted_intent == 'no_match':
+                    matched = self._match_pattern(preprocessed_text)
+                    if matched is not None:
+                        predicted_intent, confidence = matched
+            # 'unknown' means no model was loaded; don't pin that result
+            if predicted_intent != 'unknown':
+                self._cache_prediction(token_key, (predicted_intent, confidence))
+                self._cache_prediction(cache_key, (predicted_intent, confidence))
+
+        response = self.response_handler.get_response(predicted_intent, confidence, context_handler.get_context())
+        context_handler.add_bot_response(response)
+
+        return _result(response, predicted_intent, confidence)
+
+    def get_or_create_session(self, user_id):
+        """
+        Returns the conversation context for an API user. Contexts are kept in
+        LRU order; when there are more than MAX_USER_SESSIONS, the least
+        recently used one is cleared and returned to a pool for reuse.
+        """
+        with self._sessions_lock:
+            context_handler = self.user_sessions.get(user_id)
+            if context_handler is not None:
+                self.user_sessions.move_to_end(user_id)
+                return context_handler
+
+            if self._session_pool:
+                context_handler = self._session_pool.pop()
+            else:
+                context_handler = ContextHandler(self.config.CONTEXT_WINDOW_SIZE)
+            self.user_sessions[user_id] = context_handler
 
-        self.context_handler.add_user_query(user_input)
-        preprocessed_text = self.preprocessor.preprocess(user_input)
+            while len(self.user_sessions) > self.config.MAX_USER_SESSIONS:
+                _, evicted = self.user_sessions.popitem(last=False)
+                evicted.clear_context()
+                self._session_pool.append(evicted)
+            return context_handler
+
+    def _get_cached_prediction(self, key):
+        """Returns a cached (intent, confidence) and marks it recently used, or None."""
+        with self._prediction_cache_lock:
+            result = self._prediction_cache.get(key)
+            if result is not None:
+                self._prediction_cache.move_to_end(key)
+            return result
+
+    def _cache_prediction(self, key, result):
+        """Stores a prediction, evicting the least recently used entry when full."""
+        with self._prediction_cache_lock:
+            self._prediction_cache[key] = result
+            self._prediction_cache.move_to_end(key)
+            if len(self._prediction_cache) > self.config.PREDICTION_CACHE_SIZE:
+                self._prediction_cache.popitem(last=False)
+
+    def _start_prediction_cache_prewarm(self):
+        if self.config.PREDICTION_CACHE_PREWARM_SIZE > 0:
+            self._start_warmup_thread(self._prewarm_prediction_cache)
+
+    def _start_warmup_thread(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._warmup_threads.append(thread)
+
+    def _join_warmup_threads(self):
+        """
+        Waits for the cache prewarm and pattern index threads to finish. Must
+        be called before forking: a child forked while one of them holds
+        _prediction_cache_lock (or a lock inside the model) inherits the lock
+        held, with no thread left to release it.
+        """
+        threads, self._warmup_threads = self._warmup_threads, []
+        for thread in threads:
+            thread.join()
+
+    def _prewarm_prediction_cache(self):
+        """
+        Predicts the most frequent training patterns ahead of time, so common
+        inputs such as greetings are answered straight from the cache.
+        """
         try:
-            predicted_intent, confidence = self.intent_classifier.predict_intent(preprocessed_text)
+            counts = Counter(
+                pattern.strip().lower()
+                for intent in self.data.get('intents', [])
+                for pattern in intent.get('patterns', [])
+                if pattern.strip()
+            )
+            patterns = [p for p, _ in counts.most_common(self.config.PREDICTION_CACHE_PREWARM_SIZE)]
+            threshold = self.config.CONFIDENCE_THRESHOLD
+            batch_size = self.config.INTENT_BATCH_SIZE
+            for start in range(0, len(patterns), batch_size):
+                chunk = patterns[start:start + batch_size]
+                results = self.intent_classifier.predict_intent_batch(
+                    [self.preprocessor.preprocess(p) for p in chunk]
+                )
+                for pattern, result in zip(chunk, results):
+                    if result[0] != 'unknown':
+                        self._cache_prediction((pattern, threshold), result)
+            logger.info(f"Prewarmed prediction cache with {len(patterns)} training patterns.")
         except Exception as e:
-            logger.error(f"Prediction error: {e}")
-            return {"response": "Sorry, I'm having trouble understanding right now.", "intent": "error", "confidence": 0.0}
+            logger.warning(f"Failed to prewarm prediction cache: {e}")
+
+    def clear_prediction_cache(self):
+        """Drops all cached predictions, e.g. after the model changes."""
+        with self._prediction_cache_lock:
+            self._prediction_cache.clear()
+        # Pattern embeddings belong to the previous model as well
+        self._pattern_index = None
+
+    def rebuild_pattern_index(self):
+        """Encodes the training patterns with the current model in the background."""
+        if self.config.ENABLE_PATTERN_MATCH:
+            self._start_warmup_thread(self._build_pattern_index)
 
-        response = self.response_handler.get_response(predicted_intent, confidence, self.context_handler.get_context())
-        self.context_handler.add_bot_response(response)
+    def _build_pattern_index(self):
+        classifier = self.intent_classifier
+        try:
+            index = PatternIndex.build(
+                classifier, self.preprocessor, self.data, batch_size=self.config.INTENT_BATCH_SIZE
+            )
+        except Exception as e:
+            logger.warning(f"Failed to build pattern index: {e}")
+            return
+        # Drop the result if the model was swapped while encoding
+        if classifier is self.intent_classifier:
+            self._pattern_index = index
 
-        return {"response": response, "intent": predicted_intent, "confidence": confidence}
+    def _match_pattern(self, preprocessed_text):
+        """
+        Maps a low-confidence input to the intent of its most similar training
+        pattern, if that pattern is similar enough.
+
+        Returns:
+            tuple: The (intent, similarity), or None if there is no close match.
+        """
+        index = self._pattern_index
+        if index is None or not preprocessed_text:
+            return None
+        try:
+            embedding = self.intent_classifier.encode_batch([preprocessed_text])[0]
+            intent, similarity = index.match(embedding)
+        except Exception as e:
+            logger.warning(f"Pattern match failed: {e}")
+            return None
+        if similarity < self.config.PATTERN_MATCH_THRESHOLD:
+            return None
+        logger.info(f"Matched low-confidence input to intent '{intent}' (similarity {similarity:.3f})")
+        return intent, similarity
 
     # ==================== API KEYS ====================
     def generate_api_key(self, user_id: str = "default_user") -> str:
@@ -153,22 +513,53 @@ class ChatbotApp:
     def start_api_server(self):
         host = getattr(self.config, 'API_HOST', '0.0.0.0')
         port = getattr(self.config, 'API_PORT', 8080)
+        keepalive_timeout = getattr(self.config, 'API_KEEPALIVE_TIMEOUT', 5)
 
         app_ref = self
 
         class ChatRequestHandler(BaseHTTPRequestHandler):
+            # Keep the default header set small
+            server_version = ""
+            sys_version = ""
+            # Keep connections open between requests so clients do not pay a
+            # TCP handshake per message. Idle connections are dropped after
+            # the timeout so they do not pin a handler thread indefinitely.
+            protocol_version = "HTTP/1.1" if keepalive_timeout > 0 else "HTTP/1.0"
+            timeout = keepalive_timeout or None
+
+            # Per-request access logging is disabled; see _send_json for the
+            # DEBUG-level structured log.
+            def log_request(self, *args, **kwargs):
+                pass
+
+            def log_message(self, *args, **kwargs):
+                pass
+
+            def date_time_string(self, timestamp=None):
+                # Used by send_error, which http.server calls for malformed requests
+                if timestamp is not None:
+                    return super().date_time_string(timestamp)
+                return _cached_http_date()
+
             def _send_json(self, code, payload):
                 try:
-                    body = json.dumps(payload).encode('utf-8')
+                    body = json_utils.dumps_bytes(payload)
                 except Exception:
                     body = b"{}"
-                self.send_response(code)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Content-Length', str(len(body)))
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-API-Key')
-                self.end_headers()
-                self.wfile.write(body)
+                connection = b"Connection: close\r\n" if self.close_connection else b""
+                # Write status line, headers and body with a single call
+                self.wfile.write(
+                    _STATUS_LINES[code] + _date_header() + connection + _JSON_HEADERS
+                    + b"%d\r\n\r\n" % len(body) + body
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug({
+                        'event': 'api_request',
+                        'method': self.command,
+                        'path': self.path,
+                        'status': code,
+                        'client': self.client_address[0]
+                    })
 
             def do_GET(self):
                 if self.path == '/':
@@ -184,21 +575,22 @@ class ChatbotApp:
                 return self._send_json(404, {"error": "Not Found"})
 
             def do_OPTIONS(self):
-                self.send_response(204)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-                self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-API-Key')
-                self.end_headers()
+                # A 204 has no body, so no Content-Length is sent (RFC 9110 §8.6)
+                connection = b"Connection: close\r\n" if self.close_connection else b""
+                self.wfile.write(_STATUS_LINES[204] + _date_header() + connection + _OPTIONS_HEADERS)
 
             def do_POST(self):
                 try:
                     if self.path != '/chat':
+                        # The request body is left unread, so the connection
+                        # cannot be reused.
+                        self.close_connection = True
                         return self._send_json(404, {"error": "Not Found"})
 
                     content_length = int(self.headers.get('Content-Length', '0'))
                     raw = self.rfile.read(content_length) if content_length > 0 else b"{}"
                     try:
-                        payload = json.loads(raw.decode('utf-8'))
+                        payload = json_utils.loads(raw)
                     except Exception:
                         return self._send_json(400, {"error": "Invalid JSON"})
 
@@ -215,7 +607,7 @@ class ChatbotApp:
                         return self._send_json(403, {"error": "Invalid or expired API key"})
 
                     # Process input using the app's pipeline
-                    response_data = app_ref.process_input(message)
+                    response_data = app_ref.process_input(message, user_id=user_id)
 
                     # Log the API session
                     app_ref.log_api_session(user_id, api_key, payload, response_data)
@@ -227,11 +619,21 @@ class ChatbotApp:
                         "confidence": response_data.get("confidence")
                     })
                 except Exception as e:
-                    logger.error(f"API error: {e}")
+                    # Lazy formatting; the traceback is only collected at DEBUG level
+                    logger.error("API error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+                    self.close_connection = True
                     return self._send_json(500, {"error": "Internal Server Error"})
 
-        # Create server bound to host:port
-        self._httpd = HTTPServer((host, port), ChatRequestHandler)
+        workers = self._get_api_worker_count()
+        if workers > 1:
+            self._start_api_workers(host, port, ChatRequestHandler, workers)
+            return
+
+        # Create server bound to host:port. Requests are handled on their own
+        # threads so concurrent predictions can be batched together.
+        self._httpd = _create_api_server(
+            ThreadingHTTPServer, (host, port), ChatRequestHandler, self.config.API_LISTEN_BACKLOG
+        )
 
         def serve():
             try:
@@ -242,71 +644,287 @@ class ChatbotApp:
         self._api_thread = threading.Thread(target=serve, daemon=True)
         self._api_thread.start()
 
+    def _get_api_worker_count(self):
+        """
+        Returns the number of API worker processes to fork. A value of 1 keeps
+        the single threaded server; 0 means one worker per spare CPU core.
+        """
+        workers = getattr(self.config, 'API_WORKERS', 1)
+        if workers == 0:
+            workers = max(1, (os.cpu_count() or 1) - 1)
+        if workers <= 1:
+            return 1
+        if not hasattr(socket, 'SO_REUSEPORT') or 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("Multi-process API server is not supported on this platform. Using a single worker.")
+            return 1
+        if not self._model_loaded:
+            # The initial training is still running on a thread here, which
+            # must not be forked; serve from this process until restart.
+            logger.warning("Model is not loaded yet. Using a single API worker until the next restart.")
+            return 1
+        return workers
+
+    def _start_api_workers(self, host, port, handler_cls, workers):
+        """
+        Forks worker processes that each bind host:port with SO_REUSEPORT.
+        The loaded model's weights are placed in shared memory first so all
+        workers use one copy; this process keeps no listener and only
+        supervises them.
+        """
+        # Workers start with the prewarmed cache and pattern index, and never
+        # with a lock held by a thread that did not survive the fork
+        self._join_warmup_threads()
+        # One physical copy of the weights for all workers
+        self.intent_classifier.share_memory()
+        # The fast tokenizer's thread pool is not fork-safe; each worker
+        # encodes single requests, so it is turned off before forking
+        os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+        ctx = multiprocessing.get_context('fork')
+        for _ in range(workers):
+            worker = ctx.Process(
+                target=_serve_api_worker,
+                args=(host, port, handler_cls, self.config.API_LISTEN_BACKLOG, self._flush_api_log, self._reload_model),
+                daemon=True
+            )
+            worker.start()
+            self._api_workers.append(worker)
+        logger.info(f"Started {workers} API worker processes on {host}:{port}")
+
     def stop_api_server(self):
         try:
-            if self._httpd:
+            if self._httpd is not None:
                 self._httpd.shutdown()
                 self._httpd.server_close()
                 self._httpd = None
+            # Workers write their queued session logs before exiting
+            for worker in self._api_workers:
+                worker.terminate()
+            for worker in self._api_workers:
+                worker.join(timeout=10)
+            self._api_workers = []
         except Exception:
             pass
+        self._flush_api_log()
 
     def log_api_session(self, user_id, api_key, request_data, response_data):
-        """Logs an API session to the database."""
+        """
+        Queues an API session for the background database writer. Entries are
+        dropped, with a warning, if the writer has fallen too far behind.
+        """
         try:
-            from utils.database import get_db_connection
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+            entry = (user_id, api_key, json_utils.dumps(request_data), json_utils.dumps(response_data))
+            self._get_api_log_queue().put_nowait(entry)
+        except queue.Full:
+            logger.warning("API session log queue is full; dropping session log entry.")
+        except Exception as e:
+            logger.error(f"Failed to queue API session log: {e}", exc_info=True)
+
+    def _get_api_log_queue(self):
+        # Threads do not survive a fork, so the writer is started lazily in
+        # whichever process logs first.
+        with self._api_log_lock:
+            if self._api_log_pid != os.getpid():
+                self._api_log_queue = queue.Queue(maxsize=self.config.API_LOG_QUEUE_SIZE)
+                self._api_log_thread = threading.Thread(
+                    target=self._api_log_writer, args=(self._api_log_queue,), daemon=True
+                )
+                self._api_log_thread.start()
+                self._api_log_pid = os.getpid()
+            return self._api_log_queue
+
+    def _flush_api_log(self, timeout=5.0):
+        """
+        Stops this process's API session log writer once it has written every
+        entry queued so far. The writer is a daemon thread, so without this
+        queued sessions are lost on exit. A later log_api_session starts a
+        new writer.
+        """
+        with self._api_log_lock:
+            if self._api_log_pid != os.getpid():
+                return
+            pending, writer = self._api_log_queue, self._api_log_thread
+            self._api_log_pid = None
+        try:
+            pending.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("API session log writer did not catch up; some session logs were not written.")
+            return
+        writer.join(timeout)
+
+    def _api_log_writer(self, pending):
+        """
+        Drains queued API sessions and inserts them in batches, so there is one
+        commit per batch instead of one per request. A single connection is
+        kept open for the lifetime of the writer. A None entry (queued by
+        _flush_api_log) writes the batch in progress and stops the writer.
+        """
+        batch_size = self.config.API_LOG_BATCH_SIZE
+        flush_interval = self.config.API_LOG_FLUSH_INTERVAL_MS / 1000.0
+        conn = None
+        stopping = False
+        while not stopping:
+            batch = []
+            entry = pending.get()
+            deadline = time.monotonic() + flush_interval
+            while True:
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= batch_size or remaining <= 0:
+                    break
+                try:
+                    entry = pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+            try:
+                if conn is None:
+                    conn = get_wal_connection()
+                conn.executemany(
                     """
                     INSERT INTO api_sessions (user_id, api_key, request_data, response_data)
                     VALUES (?, ?, ?, ?)
                     """,
-                    (
-                        user_id,
-                        api_key,
-                        json.dumps(request_data),
-                        json.dumps(response_data)
-                    )
+                    batch
                 )
                 conn.commit()
-        except Exception as e:
-            logger.error(f"Failed to log API session to database: {e}", exc_info=True)
+            except Exception as e:
+                logger.error(f"Failed to log {len(batch)} API sessions to database: {e}", exc_info=True)
+                # Reconnect on the next batch
+                if conn is not None:
+                    conn.close()
+                    conn = None
+        if conn is not None:
+            conn.close()
 
     def retrain_model(self, background=False):
         """
-        Retrains the intent classification model. If background=True, runs in a separate thread and hot-swaps model on completion.
+        Retrains the intent classification model. If background=True, trains in a separate process and hot-swaps the model from disk on completion.
+        Only one retrain runs at a time; a request made while one is in progress is ignored.
+
+        Returns:
+            bool: False if a retrain was already in progress.
         """
         def _retrain():
             logger.info("[Retrain] Background retraining started...")
             try:
-                new_classifier = IntentClassifier(self.config)
-                new_classifier.train_model(self.data, self.preprocessor)
+                # Training is CPU bound; a spawned process keeps it off this
+                # process's GIL so inference stays responsive meanwhile.
+                ctx = multiprocessing.get_context('spawn')
+                result_queue = ctx.Queue()
+                process = ctx.Process(
+                    target=_retrain_worker, args=(self.config, self.data, result_queue), daemon=True
+                )
+                process.start()
+                # Read the result before joining: the child cannot exit until
+                # the queue's feeder thread has flushed the result to the pipe
+                while True:
+                    try:
+                        ok, error = result_queue.get(timeout=1.0)
+                        break
+                    except queue.Empty:
+                        if not process.is_alive():
+                            # The child may have put its result just before
+                            # exiting; otherwise it crashed without reporting
+                            try:
+                                ok, error = result_queue.get(timeout=1.0)
+                                break
+                            except queue.Empty:
+                                raise RuntimeError(f"training process exited with code {process.exitcode}")
+                process.join()
+                if not ok:
+                    raise RuntimeError(error)
+
                 logger.info("[Retrain] Model retraining completed. Hot-swapping model.")
-                self.intent_classifier = new_classifier
-                if self.gui:
+                self._load_and_swap_model()
+                self._reload_api_workers()
+                if self.gui is not None:
                     self.gui.display_message("Bot", "Model retrained and updated in background!")
             except Exception as e:
                 logger.error(f"[Retrain] Error during background retraining: {e}", exc_info=True)
-                if self.gui:
+                if self.gui is not None:
                     self.gui.display_message("Bot", "Background retraining failed. See logs.")
+            finally:
+                self._retrain_lock.release()
+
+        if not self._retrain_lock.acquire(blocking=False):
+            logger.warning("Retrain already in progress; skipping duplicate request.")
+            if self.gui is not None:
+                self.gui.display_message("Bot", "Model retraining is already in progress.")
+            return False
 
         if background:
             logger.info("[Retrain] Initiating background retraining...")
-            retrain_thread = threading.Thread(target=_retrain, daemon=True)
-            retrain_thread.start()
+            try:
+                threading.Thread(target=_retrain, daemon=True).start()
+            except Exception:
+                self._retrain_lock.release()
+                raise
         else:
             logger.info("Retraining command received. Starting model retraining...")
             try:
-                self.intent_classifier = IntentClassifier(self.config)
-                self.intent_classifier.train_model(self.data, self.preprocessor)
+                # Train a new instance and swap it in as a single assignment, so
+                # concurrent predictions never see a half-trained classifier
+                new_classifier = IntentClassifier(self.config)
+                new_classifier.train_model(self.data, self.preprocessor)
+                self.intent_classifier = new_classifier
+                self.clear_prediction_cache()
+                self._start_prediction_cache_prewarm()
+                self.rebuild_pattern_index()
+                self._reload_api_workers()
                 logger.info("Model retraining completed successfully.")
-                if self.gui:
+                if self.gui is not None:
                     self.gui.display_message("Bot", "Model has been successfully retrained!")
             except Exception as e:
                 logger.error(f"An error occurred during model retraining: {e}", exc_info=True)
-                if self.gui:
+                if self.gui is not None:
                     self.gui.display_message("Bot", "An error occurred while retraining the model. Please check the logs.")
+            finally:
+                self._retrain_lock.release()
+        return True
+
+    def _load_and_swap_model(self):
+        """
+        Loads the saved model into a new classifier, warms it up and swaps it
+        in, then resets the caches that belong to the previous model.
+        """
+        new_classifier = IntentClassifier(self.config)
+        if not new_classifier.load_model():
+            raise RuntimeError("retrained model files could not be loaded")
+        if self.config.COMPILE_MODEL:
+            new_classifier.compile_for_inference()
+        self._warmup(new_classifier)
+        self.intent_classifier = new_classifier
+        self._model_loaded = True
+        self.clear_prediction_cache()
+        self._start_prediction_cache_prewarm()
+        self.rebuild_pattern_index()
+
+    def _reload_api_workers(self):
+        """
+        Tells forked API workers to load the retrained model. Each worker holds
+        its own copy of the classifier and prediction cache, so swapping the
+        model here does not reach them. They are signalled rather than
+        re-forked, because forking from a process that runs the GUI or other
+        threads could hand the new workers a held lock.
+        """
+        workers = [worker for worker in self._api_workers if worker.is_alive()]
+        for worker in workers:
+            os.kill(worker.pid, signal.SIGHUP)
+        if workers:
+            logger.info(f"Asked {len(workers)} API worker processes to reload the model.")
+
+    def _reload_model(self):
+        """Runs in an API worker on SIGHUP: swaps in the model saved by a retrain."""
+        with self._reload_lock:
+            try:
+                self._load_and_swap_model()
+                logger.info(f"API worker {os.getpid()} reloaded the model.")
+            except Exception as e:
+                logger.error(f"API worker {os.getpid()} failed to reload the model: {e}", exc_info=True)
 
 
     def get_sessions_dir(self):
@@ -316,23 +934,47 @@ class ChatbotApp:
 
     def list_sessions(self):
         sessions_dir = self.get_sessions_dir()
-        return sorted([f for f in os.listdir(sessions_dir) if f.endswith('.json')])
+        with os.scandir(sessions_dir) as entries:
+            names = [e.name for e in entries if e.name.endswith(('.jsonl', '.json')) and e.is_file()]
+        names.sort()
+        return names
 
     def save_history(self, session_name=None):
         """
         Saves the current conversation history to a new session file (timestamped if not provided).
+        Sessions are stored as JSON Lines; saving again to the session that was last
+        saved or loaded only appends the entries added since, unless some of them
+        have already left the context window, in which case the file is rewritten.
         """
         try:
             if session_name is None:
-                session_name = datetime.now().strftime('session_%Y%m%d_%H%M%S.json')
+                session_name = datetime.now().strftime('session_%Y%m%d_%H%M%S.jsonl')
             sessions_dir = self.get_sessions_dir()
             session_path = os.path.join(sessions_dir, session_name)
-            with open(session_path, 'w', encoding='utf-8') as f:
-                json.dump(list(self.context_handler.get_context()), f, indent=4)
+            if not session_name.endswith('.jsonl'):
+                # Legacy sessions are a single JSON array and are rewritten whole
+                with open(session_path, 'wb') as f:
+                    records = ContextHandler.as_records(self.context_handler.get_context())
+                    f.write(json_utils.dumps_bytes(records, indent=True))
+            else:
+                append = session_name == self._saved_session and os.path.isfile(session_path)
+                if append and self.context_handler.turns - self._saved_turns > len(self.context_handler.get_context()):
+                    # Some turns since the last save have already left the
+                    # window; appending the rest would leave a gap in the file
+                    logger.warning(f"Turns since the last save of {session_name} are no longer in the context window; rewriting it.")
+                    append = False
+                if append:
+                    entries = self.context_handler.get_context_since(self._saved_turns)
+                else:
+                    entries = self.context_handler.get_context()
+                with open(session_path, 'ab' if append else 'wb') as f:
+                    f.write(b"".join(json_utils.dumps_bytes(record) + b"\n" for record in ContextHandler.as_records(entries)))
+            self._saved_session = session_name
+            self._saved_turns = self.context_handler.turns
             logger.info(f"Session saved: {session_path}")
             self.gui.display_message("Bot", f"Session saved as {session_name}.")
-            if hasattr(self.gui, 'refresh_sessions_sidebar'):
-                self.gui.refresh_sessions_sidebar()
+            if self._refresh_sessions_sidebar is not None:
+                self._refresh_sessions_sidebar()
         except Exception as e:
             logger.error(f"Failed to save session: {e}", exc_info=True)
             self.gui.display_message("Bot", "Failed to save session.")
@@ -341,6 +983,8 @@ class ChatbotApp:
     def load_history(self, session_name=None):
         """
         Loads conversation history from a session file (default: latest session).
+        The file is parsed on a worker thread and messages are handed to the GUI
+        in chunks, so the window stays responsive for long sessions.
         """
         try:
             sessions = self.list_sessions()
@@ -350,29 +994,127 @@ class ChatbotApp:
             if session_name is None:
                 session_name = sessions[-1]  # Load latest session by default
             session_path = os.path.join(self.get_sessions_dir(), session_name)
-            with open(session_path, 'r', encoding='utf-8') as f:
-                history = json.load(f)
             self.context_handler.clear_context()
             self.gui.clear_chat()
-            for entry in history:
-                if isinstance(entry, dict):
-                    sender = "User" if entry.get('role', 'user') == 'user' else "Bot"
-                    self.gui.display_message(sender, entry.get('text', str(entry)))
-                    self.context_handler.context.append(entry)
+            # Later saves to this session append to it
+            self._saved_session = session_name
+            self._saved_turns = 0
+            self._history_generation += 1
+            self._history_executor.submit(self._read_history, session_path, session_name, self._history_generation)
+        except Exception as e:
+            logger.error(f"Failed to load session: {e}", exc_info=True)
+            self.gui.display_message("Bot", "Failed to load session.")
+
+    def _read_history(self, session_path, session_name, generation):
+        """
+        Worker-thread half of load_history: streams the session file and emits
+        its messages and (role, text) turns to the GUI in chunks of
+        HISTORY_CHUNK_SIZE as they are parsed. The context is only touched on
+        the GUI thread (see restore_history), never here.
+        """
+        chunk_size = self.config.HISTORY_CHUNK_SIZE
+        try:
+            with open(session_path, 'rb') as f:
+                if session_path.endswith('.jsonl'):
+                    entries = (json_utils.loads(line) for line in f if line.strip())
                 else:
-                    # If entry is a string or other type, skip or handle as needed
-                    continue
+                    entries = json_utils.iter_array(f)
+                chunk = []
+                turns = []
+                for entry in entries:
+                    if isinstance(entry, dict):
+                        role = entry.get('role', 'user')
+                        text = entry.get('text', str(entry))
+                        chunk.append(("User" if role == 'user' else "Bot", text))
+                        turns.append((role, text))
+                    else:
+                        # If entry is a string or other type, skip or handle as needed
+                        continue
+                    if len(chunk) >= chunk_size:
+                        if generation != self._history_generation:
+                            return  # A newer load has started
+                        self.gui.history_chunk_ready.emit(generation, chunk, turns)
+                        chunk = []
+                        turns = []
+            if generation != self._history_generation:
+                return
+            chunk.append(("Bot", f"Session '{session_name}' loaded."))
+            self.gui.history_chunk_ready.emit(generation, chunk, turns)
             logger.info(f"Session loaded: {session_name}")
-            self.gui.display_message("Bot", f"Session '{session_name}' loaded.")
         except Exception as e:
             logger.error(f"Failed to load session: {e}", exc_info=True)
-            self.gui.display_message("Bot", "Failed to load session.")
+            self.gui.history_chunk_ready.emit(generation, [("Bot", "Failed to load session.")], [])
+
+    def restore_history(self, generation, turns):
+        """
+        Restores (role, text) turns parsed by _read_history into the context.
+        Runs on the GUI thread, like process_input, so the two never write
+        the ring buffers at the same time.
+
+        Returns:
+            bool: False if the turns belong to a load that has been superseded
+            (and so were not restored).
+        """
+        if generation != self._history_generation:
+            return False
+        for role, text in turns:
+            self.context_handler.restore(role, text)
+        return True
+
+    def _install_signal_handlers(self):
+        """
+        Quits the Qt event loop on SIGINT/SIGTERM. Python only runs signal
+        handlers once the interpreter regains control, so the signal is also
+        written to a socket that Qt watches; this wakes the event loop only
+        when a signal actually arrives.
+        """
+        from PyQt6.QtCore import QSocketNotifier
+
+        self._signal_rsock, self._signal_wsock = socket.socketpair()
+        self._signal_rsock.setblocking(False)
+        self._signal_wsock.setblocking(False)
+        signal.set_wakeup_fd(self._signal_wsock.fileno())
+
+        def drain():
+            try:
+                self._signal_rsock.recv(64)
+            except BlockingIOError:
+                pass
+
+        self._signal_notifier = QSocketNotifier(self._signal_rsock.fileno(), QSocketNotifier.Type.Read, self.app)
+        self._signal_notifier.activated.connect(drain)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.request_shutdown())
+
+    def request_shutdown(self):
+        """
+        Asks the application to exit: wakes a headless run immediately, or
+        quits the Qt event loop when the GUI is running.
+        """
+        self._shutdown.set()
+        if self.app is not None:
+            self.app.quit()
 
     def run(self):
         """
-        Starts the main event loop of the application.
+        Starts the main event loop of the application. In headless mode only
+        the API server runs, until SIGINT or SIGTERM is received.
         """
-        sys.exit(self.app.exec())
+        if self.app is None:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.request_shutdown())
+            try:
+                self._shutdown.wait()
+            finally:
+                self.stop_api_server()
+            sys.exit(0)
+
+        self._install_signal_handlers()
+        try:
+            exit_code = self.app.exec()
+        finally:
+            self.stop_api_server()
+        sys.exit(exit_code)
 
 if __name__ == '__main__':
     bot = ChatbotApp()
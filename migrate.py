@@ -5,26 +5,65 @@ Run this script to perform all database migrations in sequence.
 
 import sqlite3
 import os
+from contextlib import closing
 from datetime import datetime
 from utils.logger import get_logger
+from utils.database import configure_connection, STATEMENT_CACHE_SIZE
 import sys
 
 logger = get_logger(__name__)
 
 # Database configuration
 DB_FILE = os.path.join('data', 'chatbot.db')
+# Last version known to be applied, so an up-to-date start needs no SQL at all
+VERSION_FILE = os.path.join('data', '.db_version')
+# Snapshot of the database taken before pending migrations are applied
+BACKUP_FILE = DB_FILE + '.bak'
+# Connection shared by every step of a migration run (see get_db_connection)
+_conn = None
 
-def get_db_connection():
-    """Establishes a connection to the SQLite database."""
+def _open():
+    """Creates the data directory and opens a configured connection."""
     os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return configure_connection(sqlite3.connect(DB_FILE, cached_statements=STATEMENT_CACHE_SIZE))
+
+def get_db_connection():
+    """
+    Returns the migration connection, opening it on first use. Using it as a
+    context manager commits (or rolls back) but does not close it; call
+    close_db when done.
+    """
+    global _conn
+    if _conn is None:
+        _conn = _open()
+    return _conn
 
-def initialize_database():
-    """Creates the initial database structure."""
+def close_db():
+    """Closes the migration connection, if open."""
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+# Indexes for the lookups the application makes: API key verification by
+# key hash, and the session viewer listing (optionally per user) by time
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_api_keys_key_hash ON api_keys(key_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_api_sessions_user_ts ON api_sessions(user_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_api_sessions_ts ON api_sessions(timestamp)",
+)
+
+def initialize_database(squash_to=None):
+    """
+    Creates the initial database structure. The tables are created with the
+    columns added by every migration, so for a new database squash_to can be
+    given to record migrations up to that version as applied in the same
+    transaction instead of running them.
+    """
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        # sqlite3 does not begin a transaction before CREATE TABLE on its own
+        cursor.execute("BEGIN")
         
         # Create version tracking table
         cursor.execute("""
@@ -61,134 +100,254 @@ def initialize_database():
                 endpoint TEXT
             )
         """)
-        
+
+        for statement in INDEXES:
+            cursor.execute(statement)
+
+        if squash_to:
+            cursor.execute(
+                "INSERT INTO db_version (version, description) VALUES (?, ?)",
+                (squash_to, "Initial schema (squashed migrations)")
+            )
         conn.commit()
         logger.info("Database initialized with base tables")
 
-def get_current_version():
-    """Gets the current database version."""
+def get_current_version(conn=None):
+    """Gets the current database version, using the migration connection by default."""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT MAX(version) as version FROM db_version")
-            result = cursor.fetchone()
-            return result['version'] if result and result['version'] is not None else 0
+        result = (conn or get_db_connection()).execute(
+            "SELECT MAX(version) as version FROM db_version"
+        ).fetchone()
+        return result['version'] if result and result['version'] is not None else 0
     except Exception as e:
         logger.error(f"Failed to get database version: {e}")
         return 0
 
-def record_migration(version, description):
-    """Records a successful migration."""
+def record_migration(version, description, conn=None):
+    """Records a successful migration. Committed by run_migrations with the migration itself."""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO db_version (version, description) VALUES (?, ?)",
-                (version, description)
-            )
-            conn.commit()
-            logger.info(f"Recorded migration version {version}: {description}")
+        (conn or get_db_connection()).execute(
+            "INSERT INTO db_version (version, description) VALUES (?, ?)",
+            (version, description)
+        )
+        logger.info(f"Recorded migration version {version}: {description}")
     except Exception as e:
         logger.error(f"Failed to record migration: {e}")
         raise
 
-def migration_001_add_api_key_column():
+def _read_version_file():
+    """
+    Returns the version stored in VERSION_FILE, or 0 when it is missing,
+    unreadable, or the database file itself no longer exists.
+    """
+    if not os.path.exists(DB_FILE):
+        return 0
+    try:
+        with open(VERSION_FILE, encoding='utf-8') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return 0
+
+def _write_version_file(version):
+    """Atomically stores the applied version for the next run's fast check."""
+    tmp_path = f"{VERSION_FILE}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(str(version))
+        os.replace(tmp_path, VERSION_FILE)
+    except OSError as e:
+        logger.warning(f"Could not write {VERSION_FILE}: {e}")
+
+def _backup_database(conn):
+    """
+    Copies the database to BACKUP_FILE with SQLite's online backup API, which
+    copies pages directly instead of dumping and re-importing SQL.
+    """
+    with closing(sqlite3.connect(BACKUP_FILE)) as backup:
+        conn.backup(backup)
+    logger.info(f"Database backed up to {BACKUP_FILE}")
+
+def _restore_database(conn):
+    """
+    Copies BACKUP_FILE back over the database through the open connection,
+    which stays valid (replacing the file under it would not be safe in WAL
+    mode).
+    """
+    with closing(sqlite3.connect(BACKUP_FILE)) as backup:
+        backup.backup(conn)
+    logger.info(f"Database restored from {BACKUP_FILE}")
+
+def _snapshot_schema(conn):
+    """
+    Reads the columns of every table once, so migrations can check for
+    existing columns without querying the schema again.
+
+    Returns:
+        dict: Table name -> set of column names.
+    """
+    tables = [row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+    return {
+        table: {col['name'] for col in conn.execute(f'PRAGMA table_info("{table}")')}
+        for table in tables
+    }
+
+def _add_column(conn, schema, table, column, definition):
+    """Adds a column unless the schema snapshot already has it, and records it there."""
+    columns = schema.setdefault(table, set())
+    if column in columns:
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    columns.add(column)
+    return True
+
+def migration_001_add_api_key_column(conn, schema):
     """
     Migration 001: Add api_key column to api_keys table
     """
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if api_key column exists
-            cursor.execute("PRAGMA table_info(api_keys)")
-            columns = [col['name'] for col in cursor.fetchall()]
-            
-            if 'api_key' not in columns:
-                logger.info("Adding api_key column to api_keys table...")
-                cursor.execute("ALTER TABLE api_keys ADD COLUMN api_key TEXT")
-                conn.commit()
-                return True
-            else:
-                logger.info("api_key column already exists")
-                return True
-                
+        if _add_column(conn, schema, 'api_keys', 'api_key', 'TEXT'):
+            logger.info("Added api_key column to api_keys table")
+        else:
+            logger.info("api_key column already exists")
+        return True
+
     except Exception as e:
         logger.error(f"Migration 001 failed: {e}")
         return False
 
-def migration_002_add_session_tracking():
+def migration_002_add_session_tracking(conn, schema):
     """
     Migration 002: Add client_ip and endpoint columns to api_sessions
     """
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check for existing columns
-            cursor.execute("PRAGMA table_info(api_sessions)")
-            columns = [col['name'] for col in cursor.fetchall()]
-            
-            if 'client_ip' not in columns:
-                cursor.execute("ALTER TABLE api_sessions ADD COLUMN client_ip TEXT")
-                
-            if 'endpoint' not in columns:
-                cursor.execute("ALTER TABLE api_sessions ADD COLUMN endpoint TEXT")
-                
-            conn.commit()
-            return True
-                
+        _add_column(conn, schema, 'api_sessions', 'client_ip', 'TEXT')
+        _add_column(conn, schema, 'api_sessions', 'endpoint', 'TEXT')
+        return True
+
     except Exception as e:
         logger.error(f"Migration 002 failed: {e}")
         return False
 
+def migration_003_add_indexes(conn, schema):
+    """
+    Migration 003: Index API key hashes and session user/timestamp columns
+    """
+    try:
+        for statement in INDEXES:
+            conn.execute(statement)
+        return True
+
+    except Exception as e:
+        logger.error(f"Migration 003 failed: {e}")
+        return False
+
 # List of all migrations
 MIGRATIONS = [
     (1, "Add api_key column", migration_001_add_api_key_column),
     (2, "Add session tracking columns", migration_002_add_session_tracking),
+    (3, "Add lookup indexes", migration_003_add_indexes),
 ]
 
-def run_migrations(target_version=None):
+def run_migrations(target_version=None, aggressive=False):
     """
     Runs all pending migrations up to target_version.
     If target_version is None, runs all available migrations.
+    Each migration is applied together with its db_version record in one
+    transaction, so a failed migration leaves no partial schema change. The
+    database is also backed up before pending migrations run, and restored
+    if any of them fails, so a run is applied entirely or not at all.
+    With aggressive=True, commits are not fsynced while the migrations run;
+    only use it when the database can be restored if the machine crashes.
     """
+    if target_version is None:
+        target_version = max(m[0] for m in MIGRATIONS)
+
+    # Usual case: nothing to do, known without opening the database
+    if _read_version_file() >= target_version:
+        logger.info("Database is up to date")
+        return True
+
+    conn = get_db_connection()
+    if aggressive:
+        conn.execute("PRAGMA synchronous=OFF")
+    backed_up = False
     try:
-        initialize_database()
-        current_version = get_current_version()
+        tables = {
+            row['name'] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name IN ('api_keys', 'db_version')"
+            )
+        }
+        # Check the version before creating anything, so an up-to-date
+        # database is only read
+        if 'db_version' in tables:
+            current_version = get_current_version(conn)
+            if current_version >= target_version:
+                logger.info(f"Current database version: {current_version}")
+                logger.info("Database is up to date")
+                _write_version_file(current_version)
+                return True
+
+        # A new database gets the final schema directly, with no ALTERs
+        is_fresh = 'api_keys' not in tables
+        initialize_database(squash_to=target_version if is_fresh else None)
+        current_version = get_current_version(conn)
         logger.info(f"Current database version: {current_version}")
         
-        if target_version is None:
-            target_version = max(m[0] for m in MIGRATIONS)
-        
         if current_version >= target_version:
             logger.info("Database is up to date")
+            _write_version_file(current_version)
             return True
             
+        _backup_database(conn)
+        backed_up = True
+
+        # Migrations check and update this instead of re-reading table_info
+        schema = _snapshot_schema(conn)
         success = True
         for version, description, migration_func in sorted(MIGRATIONS):
             if current_version < version <= target_version:
                 logger.info(f"Running migration {version}: {description}")
                 try:
-                    if migration_func():
-                        record_migration(version, description)
+                    # sqlite3 does not open a transaction before ALTER TABLE on
+                    # its own, so begin one explicitly
+                    conn.execute("BEGIN")
+                    if migration_func(conn, schema):
+                        record_migration(version, description, conn)
+                        conn.commit()
                         logger.info(f"Migration {version} completed successfully")
                     else:
+                        conn.rollback()
                         success = False
                         logger.error(f"Migration {version} failed")
                         break
                 except Exception as e:
+                    conn.rollback()
                     success = False
                     logger.error(f"Error in migration {version}: {e}")
                     break
+
+        if not success:
+            # Undo the migrations of this run that did commit
+            _restore_database(conn)
         
-        final_version = get_current_version()
+        final_version = get_current_version(conn)
         logger.info(f"Final database version: {final_version}")
+        _write_version_file(final_version)
         return success
         
     except Exception as e:
         logger.error(f"Migration process failed: {e}")
+        if backed_up:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                _restore_database(conn)
+            except Exception as restore_error:
+                logger.error(f"Failed to restore {BACKUP_FILE}: {restore_error}")
         return False
+    finally:
+        if aggressive:
+            conn.execute("PRAGMA synchronous=NORMAL")
 
 if __name__ == "__main__":
     import argparse
@@ -204,18 +363,26 @@ if __name__ == "__main__":
         action="store_true",
         help="Show current database version and available migrations"
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Skip fsyncs while migrating (only when the database can be restored after a crash)"
+    )
     
     args = parser.parse_args()
     
-    if args.info:
-        current = get_current_version()
-        latest = max(m[0] for m in MIGRATIONS)
-        print(f"Current database version: {current}")
-        print(f"Latest available version: {latest}")
-        print("\nAvailable migrations:")
-        for version, description, _ in sorted(MIGRATIONS):
-            status = "Applied" if version <= current else "Pending"
-            print(f"  [{status}] {version}: {description}")
-    else:
-        success = run_migrations(args.target)
-        sys.exit(0 if success else 1)
\ No newline at end of file
+    try:
+        if args.info:
+            current = get_current_version()
+            latest = max(m[0] for m in MIGRATIONS)
+            print(f"Current database version: {current}")
+            print(f"Latest available version: {latest}")
+            print("\nAvailable migrations:")
+            for version, description, _ in sorted(MIGRATIONS):
+                status = "Applied" if version <= current else "Pending"
+                print(f"  [{status}] {version}: {description}")
+        else:
+            success = run_migrations(args.target, aggressive=args.fast)
+            sys.exit(0 if success else 1)
+    finally:
+        close_db()
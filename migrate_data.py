@@ -1,9 +1,32 @@
-import json
-import sqlite3
 import os
 from datetime import datetime
+from itertools import islice
 from passlib.context import CryptContext
-from utils.database import get_db_connection, initialize_database
+from utils import json_utils
+from utils.database import get_db_connection
+from migrate import initialize_database
+
+# Rows inserted per executemany call while streaming the JSON files
+BATCH_SIZE = 1000
+
+def _insert_in_batches(sql, rows):
+    """
+    Inserts rows from an iterator in batches of BATCH_SIZE, so the source
+    file is parsed while earlier batches are written and never held in
+    memory at once. Everything is committed together at the end.
+
+    Returns:
+        tuple: (rows submitted, rows actually inserted)
+    """
+    submitted = inserted = 0
+    with get_db_connection() as conn:
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                break
+            submitted += len(batch)
+            inserted += conn.executemany(sql, batch).rowcount
+    return submitted, inserted
 
 def migrate_api_keys(pwd_context):
     api_keys_file = 'utils/api_keys.json'
@@ -11,31 +34,48 @@ def migrate_api_keys(pwd_context):
         print("api_keys.json not found, skipping migration.")
         return
 
-    with open(api_keys_file, 'r') as f:
-        api_keys_data = json.load(f)
+    with open(api_keys_file, 'rb') as f:
+        rows = (
+            (
+                data['key_hash'],
+                user_id,
+                datetime.fromisoformat(data['created_at']),
+                datetime.fromisoformat(data['expires_at']),
+                data.get('rate_limit', {}).get('calls_per_minute', 60),
+                data.get('rate_limit', {}).get('calls_per_day', 1000)
+            )
+            for user_id, data in json_utils.iter_object_items(f)
+        )
+        # Users that already exist are skipped by the UNIQUE constraint
+        # instead of aborting the batch
+        submitted, inserted = _insert_in_batches(
+            """
+            INSERT OR IGNORE INTO api_keys (key_hash, user_id, created_at, expires_at, rate_limit_per_minute, rate_limit_per_day)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows
+        )
+    skipped = submitted - inserted
+    if skipped:
+        print(f"{skipped} user IDs already exist in the database. Skipped.")
+    print(f"API keys migrated successfully ({inserted} inserted).")
 
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        for user_id, data in api_keys_data.items():
-            try:
-                cursor.execute(
-                    """
-                    INSERT INTO api_keys (key_hash, user_id, created_at, expires_at, rate_limit_per_minute, rate_limit_per_day)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        data['key_hash'],
-                        user_id,
-                        datetime.fromisoformat(data['created_at']),
-                        datetime.fromisoformat(data['expires_at']),
-                        data.get('rate_limit', {}).get('calls_per_minute', 60),
-                        data.get('rate_limit', {}).get('calls_per_day', 1000)
-                    )
-                )
-            except sqlite3.IntegrityError:
-                print(f"User ID {user_id} already exists in the database. Skipping.")
-        conn.commit()
-    print("API keys migrated successfully.")
+def _session_rows(sessions):
+    for session in sessions:
+        try:
+            yield (
+                "migrated_key",  # API key is not stored in the old format
+                session['user_id'],
+                datetime.fromisoformat(session['timestamp']),
+                json_utils.dumps({"message": session.get("message")}),
+                json_utils.dumps({
+                    "response": session.get("response"),
+                    "intent": session.get("intent"),
+                    "confidence": session.get("confidence")
+                })
+            )
+        except Exception as e:
+            print(f"Error migrating session for user {session.get('user_id')}: {e}")
 
 def migrate_api_sessions():
     api_sessions_file = 'data/api_sessions.json'
@@ -43,34 +83,15 @@ def migrate_api_sessions():
         print("api_sessions.json not found, skipping migration.")
         return
 
-    with open(api_sessions_file, 'r') as f:
-        api_sessions_data = json.load(f)
-
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        for session in api_sessions_data:
-            try:
-                cursor.execute(
-                    """
-                    INSERT INTO api_sessions (api_key, user_id, timestamp, request_data, response_data)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (
-                        "migrated_key",  # API key is not stored in the old format
-                        session['user_id'],
-                        datetime.fromisoformat(session['timestamp']),
-                        json.dumps({"message": session.get("message")}),
-                        json.dumps({
-                            "response": session.get("response"),
-                            "intent": session.get("intent"),
-                            "confidence": session.get("confidence")
-                        })
-                    )
-                )
-            except Exception as e:
-                print(f"Error migrating session for user {session.get('user_id')}: {e}")
-        conn.commit()
-    print("API sessions migrated successfully.")
+    with open(api_sessions_file, 'rb') as f:
+        _, inserted = _insert_in_batches(
+            """
+            INSERT INTO api_sessions (api_key, user_id, timestamp, request_data, response_data)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            _session_rows(json_utils.iter_array(f))
+        )
+    print(f"API sessions migrated successfully ({inserted} inserted).")
 
 if __name__ == '__main__':
     initialize_database()
@@ -79,4 +100,4 @@ if __name__ == '__main__':
     print("Starting data migration...")
     migrate_api_keys(pwd_context)
     migrate_api_sessions()
-    print("Data migration complete.")
\ No newline at end of file
+    print("Data migration complete.")
@@ -1,121 +1,754 @@
-### ===============================
-### 1. model/bert_classifier.py
-### ===============================
+# ==============================================================================
+# model/bert_classifier.py
+# BERT intent classifier backend. Imported lazily by IntentClassifier so the
+# SVM backend can run without loading torch or transformers.
+# ==============================================================================
+import copy
+from functools import lru_cache
+import gc
+import pickle
+import os
 
+import numpy as np
 import torch
-import pickle
-import json
 from torch.utils.data import Dataset, DataLoader
-from transformers import BertTokenizer, BertForSequenceClassification, AdamW
+from transformers import BertTokenizerFast, BertForSequenceClassification
+from torch.optim import AdamW # Import AdamW directly from PyTorch
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
+
 from utils.logger import get_logger
+from utils.data_loader import load_all_intents
+from utils import json_utils
+
+try:
+    from safetensors.torch import save_file, load_file
+except ImportError:
+    save_file = load_file = None
 
 logger = get_logger(__name__)
 
+
+def _safetensors_path(path):
+    """Returns the safetensors weights file stored alongside a checkpoint path."""
+    return os.path.splitext(path)[0] + '.safetensors'
+
+
+def _torchscript_path(path):
+    """Returns the traced TorchScript model file stored alongside a checkpoint path."""
+    return os.path.splitext(path)[0] + '.ts.pt'
+
+
+class _LogitsModule(torch.nn.Module):
+    """Wraps the classifier so tracing sees a plain logits tensor as output."""
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
+
+def _collate_trimmed(samples):
+    """
+    Stacks dataset rows into a batch and drops the padding columns that no
+    row in the batch uses, so attention runs over the batch's longest text.
+    """
+    batch = {key: torch.stack([sample[key] for sample in samples]) for key in samples[0]}
+    length = int(batch['attention_mask'].sum(dim=1).max())
+    batch['input_ids'] = batch['input_ids'][:, :length].contiguous()
+    batch['attention_mask'] = batch['attention_mask'][:, :length].contiguous()
+    return batch
+
+
+class _CUDAPrefetcher:
+    """
+    Iterates a DataLoader while copying the next batch to the GPU on a side
+    stream, so the host-to-device copy overlaps the current training step.
+    """
+    def __init__(self, loader, device):
+        self.loader = loader
+        self.device = device
+        self.stream = torch.cuda.Stream(device=device)
+
+    def __iter__(self):
+        batches = iter(self.loader)
+        next_batch = self._preload(batches)
+        while next_batch is not None:
+            current_stream = torch.cuda.current_stream(self.device)
+            current_stream.wait_stream(self.stream)
+            batch = next_batch
+            for tensor in batch.values():
+                # Allocated on the side stream but used on the current one
+                tensor.record_stream(current_stream)
+            next_batch = self._preload(batches)
+            yield batch
+
+    def _preload(self, batches):
+        try:
+            batch = next(batches)
+        except StopIteration:
+            return None
+        with torch.cuda.stream(self.stream):
+            return {key: value.to(self.device, non_blocking=True) for key, value in batch.items()}
+
+
+def _pruned_heads_path(path):
+    """Returns the file listing the attention heads pruned from a checkpoint."""
+    return os.path.splitext(path)[0] + '.pruned_heads.json'
+
+
+def _save_pruned_heads(model, path):
+    """
+    Records the model's pruned attention heads, which change the shapes of the
+    saved weights, or removes the record when no heads were pruned.
+    """
+    pruned_heads = {str(layer): sorted(heads) for layer, heads in model.config.pruned_heads.items() if heads}
+    heads_path = _pruned_heads_path(path)
+    if not pruned_heads:
+        _remove_file(heads_path)
+        return
+    with open(heads_path, 'wb') as f:
+        f.write(json_utils.dumps_bytes(pruned_heads))
+
+
+def _apply_pruned_heads(model, path):
+    """Prunes a freshly built model the same way as the saved checkpoint, if it was pruned."""
+    try:
+        with open(_pruned_heads_path(path), 'rb') as f:
+            pruned_heads = json_utils.loads(f.read())
+    except FileNotFoundError:
+        return
+    model.prune_heads({int(layer): heads for layer, heads in pruned_heads.items()})
+
+
+def _label_map_path(path):
+    """Returns the label map file stored in the same folder as the given artifact path."""
+    return os.path.join(os.path.dirname(path), 'label_map.json')
+
+
+def _load_label_map(path):
+    """Returns the label map saved with the model, or None if there is none."""
+    try:
+        with open(_label_map_path(path), 'rb') as f:
+            return json_utils.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable BERT label map: {e}")
+        return None
+
+
+def _int8_path(path):
+    """Returns the int8 quantized weights file stored alongside a checkpoint path."""
+    return os.path.splitext(path)[0] + '.int8.pt'
+
+
+def _quantize_int8(model):
+    """Dynamically quantizes a CPU model's linear/recurrent layers to int8."""
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8
+    )
+
+
+def _remove_file(path):
+    """Deletes a derived model artifact so a stale copy is never loaded."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _save_state_dict(state_dict, path):
+    """
+    Saves model weights as safetensors when the package is available, or as
+    a regular torch checkpoint otherwise.
+    """
+    if save_file is not None:
+        save_file({name: tensor.contiguous() for name, tensor in state_dict.items()}, _safetensors_path(path))
+    else:
+        torch.save(state_dict, path, _use_new_zipfile_serialization=True)
+
+
+def _load_state_dict(path, device='cpu'):
+    """
+    Loads saved weights directly onto the given device. safetensors files are
+    memory-mapped without unpickling; torch checkpoints are memory-mapped where
+    supported and only tensors are unpickled, so weights are paged in lazily
+    instead of copied into a full host copy first.
+    """
+    weights_path = _safetensors_path(path)
+    if load_file is not None and os.path.exists(weights_path):
+        return load_file(weights_path, device=str(device))
+    try:
+        return torch.load(path, map_location=device, mmap=True, weights_only=True)
+    except TypeError:
+        # PyTorch < 2.1 does not support mmap loading
+        return torch.load(path, map_location=device, weights_only=True)
+
+
 class BertIntentClassifier:
+    """
+    A class for training and predicting intents using a PyTorch and BERT model.
+    """
     def __init__(self, config):
         self.config = config
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        self.tokenizer = BertTokenizer.from_pretrained(config.BERT_MODEL_PATH)
+        # Rust-backed tokenizer; same call signatures as the Python BertTokenizer
+        self.tokenizer = BertTokenizerFast.from_pretrained(config.BERT_MODEL_PATH)
+        # Token ids of recently seen texts; chat inputs repeat often
+        self._encode_text = lru_cache(maxsize=getattr(config, 'ENCODING_CACHE_SIZE', 4096))(self._encode_text_uncached)
         self.model = None
         self.label_map = None
         self.intents = []
-        logger.info(f"BERT classifier initialized on device: {self.device}")
+        logger.info(f"BERT intent classifier initialized on device: {self.device}")
 
-    def train_model(self, data, preprocessor=None):
-        patterns, labels = [], []
+    def train_model(self, data, preprocessor):
+        logger.info("Starting BERT model training process...")
+        patterns = []
+        labels = []
         for intent in data['intents']:
-            for pattern in intent['patterns']:
-                patterns.append(pattern)
-                labels.append(intent['tag'])
+            # Skip default fallback intent from training/labels
+            if intent.get('tag') == 'default':
+                continue
+            if intent['patterns']:
+                for pattern in intent['patterns']:
+                    patterns.append(pattern) # BERT can handle raw text
+                    labels.append(intent['tag'])
+        
+        if not patterns:
+            logger.error("No training patterns found. Cannot train model.")
+            return
 
-        self.intents = sorted(set(labels))
+        self.intents = sorted(list(set(labels)))
         self.label_map = {tag: i for i, tag in enumerate(self.intents)}
-
+        
+        # Prepare dataset
         X_train, X_test, y_train, y_test = train_test_split(
             patterns, labels, test_size=0.2, random_state=42, stratify=labels
         )
-
+        
         train_dataset = IntentDataset(X_train, y_train, self.tokenizer, self.label_map)
         test_dataset = IntentDataset(X_test, y_test, self.tokenizer, self.label_map)
-        train_loader = DataLoader(train_dataset, batch_size=self.config.BERT_BATCH_SIZE, shuffle=True)
-        test_loader = DataLoader(test_dataset, batch_size=self.config.BERT_BATCH_SIZE)
-
+        
+        # The datasets are already tensors, so batches are assembled in this
+        # process unless workers are configured; pinned memory lets the
+        # non_blocking copies to the GPU overlap with compute
+        num_workers = getattr(self.config, 'BERT_DATALOADER_WORKERS', 0)
+        loader_kwargs = {
+            'batch_size': self.config.BERT_BATCH_SIZE,
+            'num_workers': num_workers,
+            'pin_memory': self.device.type == 'cuda',
+            # Keep workers alive between epochs instead of re-spawning them
+            'persistent_workers': num_workers > 0,
+            'collate_fn': _collate_trimmed,
+        }
+        train_loader = DataLoader(train_dataset, shuffle=True, **loader_kwargs)
+        
+        # Initialize BERT model
         self.model = BertForSequenceClassification.from_pretrained(
-            self.config.BERT_MODEL_PATH, num_labels=len(self.intents))
+            self.config.BERT_MODEL_PATH, num_labels=len(self.intents)
+        )
         self.model.to(self.device)
+        
+        optimizer = self._create_optimizer()
 
-        optimizer = AdamW(self.model.parameters(), lr=self.config.BERT_LEARNING_RATE)
-
+        # Mixed precision on CUDA: bf16 where supported, otherwise fp16 with
+        # loss scaling to keep small gradients from underflowing
+        use_amp = self.device.type == 'cuda' and getattr(self.config, 'BERT_MIXED_PRECISION', True)
+        amp_dtype = torch.bfloat16 if use_amp and torch.cuda.is_bf16_supported() else torch.float16
+        scaler = torch.cuda.amp.GradScaler(enabled=use_amp and amp_dtype == torch.float16)
+        if self.device.type == 'cuda':
+            # TF32 matmuls for whatever still runs in float32
+            torch.backends.cuda.matmul.allow_tf32 = True
+        
+        # Training loop. On CUDA the next batch is copied while the current
+        # one trains; the .to calls below are then no-ops
+        batches = _CUDAPrefetcher(train_loader, self.device) if self.device.type == 'cuda' else train_loader
         self.model.train()
         for epoch in range(self.config.BERT_EPOCHS):
-            for batch in train_loader:
+            for batch in batches:
                 optimizer.zero_grad()
-                inputs = {k: v.to(self.device) for k, v in batch.items()}
-                outputs = self.model(**inputs)
-                outputs.loss.backward()
-                optimizer.step()
-            logger.info(f"Epoch {epoch+1}: Loss = {outputs.loss.item():.4f}")
+                input_ids = batch['input_ids'].to(self.device, non_blocking=True)
+                attention_mask = batch['attention_mask'].to(self.device, non_blocking=True)
+                labels = batch['labels'].to(self.device, non_blocking=True)
+                
+                with torch.autocast(device_type=self.device.type, dtype=amp_dtype, enabled=use_amp):
+                    outputs = self.model(input_ids, attention_mask=attention_mask, labels=labels)
+                    loss = outputs.loss
+                scaler.scale(loss).backward()
+                scaler.step(optimizer)
+                scaler.update()
+            logger.info(f"Epoch {epoch+1}/{self.config.BERT_EPOCHS}, Loss: {loss.item():.4f}")
 
+        # Pruned before evaluation, so the reported accuracy is the pruned model's
+        prune_ratio = getattr(self.config, 'BERT_PRUNE_HEADS_RATIO', 0.0)
+        if prune_ratio > 0:
+            self._prune_attention_heads(batches, prune_ratio)
+
+        # Evaluation (optional)
         self.model.eval()
-        true, preds = [], []
-        with torch.no_grad():
+        true_labels = []
+        predictions = []
+        test_loader = DataLoader(test_dataset, **loader_kwargs)
+        # No autograd state is needed for evaluation
+        with torch.inference_mode():
             for batch in test_loader:
-                inputs = {k: v.to(self.device) for k, v in batch.items() if k != 'labels'}
-                labels = batch['labels'].to(self.device)
-                logits = self.model(**inputs).logits
-                pred = torch.argmax(logits, dim=1)
-                true.extend(labels.cpu().numpy())
-                preds.extend(pred.cpu().numpy())
-
-        acc = accuracy_score(true, preds)
-        logger.info(f"BERT accuracy: {acc:.2f}")
-        logger.info(classification_report(true, preds))
-
-        import os
-        os.makedirs(os.path.dirname(self.config.MODEL_FILE_PATH), exist_ok=True)
-        torch.save(self.model.state_dict(), self.config.MODEL_FILE_PATH)
-        with open(self.config.VECTORIZER_FILE_PATH, 'wb') as f:
-            pickle.dump(self.label_map, f)
+                input_ids = batch['input_ids'].to(self.device, non_blocking=True)
+                attention_mask = batch['attention_mask'].to(self.device, non_blocking=True)
+                
+                with torch.autocast(device_type=self.device.type, dtype=amp_dtype, enabled=use_amp):
+                    logits = self.model(input_ids, attention_mask=attention_mask).logits
+                preds = torch.argmax(logits, dim=1).cpu().numpy()
+                
+                # Labels are only compared on the CPU, so they are not moved
+                true_labels.extend(batch['labels'].numpy())
+                predictions.extend(preds)
 
-    def load_model(self):
-        with open(self.config.DATA_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            self.intents = sorted(intent['tag'] for intent in data['intents'])
-            self.label_map = {tag: i for i, tag in enumerate(self.intents)}
+        accuracy = accuracy_score(true_labels, predictions)
+        logger.info(f"BERT Model training complete. Accuracy on test data: {accuracy:.2f}")
 
-        self.model = BertForSequenceClassification.from_pretrained(
-            self.config.BERT_MODEL_PATH, num_labels=len(self.intents))
-        self.model.load_state_dict(torch.load(self.config.MODEL_FILE_PATH))
-        self.model.to(self.device)
+        # Release the training state (gradients, optimizer moments, datasets)
+        # so a process that goes on to serve the model does not keep it
+        self.model.zero_grad(set_to_none=True)
+        del optimizer, scaler, batches, train_loader, test_loader, train_dataset, test_dataset
+        gc.collect()
+        if self.device.type == 'cuda':
+            torch.cuda.empty_cache()
+        logger.info("Classification Report:\n" + classification_report(true_labels, predictions, zero_division=0))
+
+        # Save model
+        try:
+            # Ensure models directory exists (BERT folder when MODEL_TYPE=bert)
+            os.makedirs(os.path.dirname(self.config.MODEL_FILE_PATH), exist_ok=True)
+            _save_state_dict(self.model.state_dict(), self.config.MODEL_FILE_PATH)
+            _save_pruned_heads(self.model, self.config.MODEL_FILE_PATH)
+            # Saved so loading does not depend on the intents still matching
+            # the ones the model was trained on
+            with open(_label_map_path(self.config.VECTORIZER_FILE_PATH), 'wb') as f:
+                f.write(json_utils.dumps_bytes(self.label_map))
+            logger.info("BERT model and label map saved successfully.")
+        except Exception as e:
+            logger.error(f"Failed to save BERT model files: {e}", exc_info=True)
+            return
+
+        # Derived artifacts are regenerated or removed, so none of them can
+        # outlive the weights they were built from
+        if getattr(self.config, 'QUANTIZE_INT8', False):
+            self.save_int8()
+        else:
+            _remove_file(_int8_path(self.config.MODEL_FILE_PATH))
+        if getattr(self.config, 'USE_TORCHSCRIPT', False):
+            self.export_torchscript()
+        else:
+            _remove_file(_torchscript_path(self.config.MODEL_FILE_PATH))
+
+    def _prune_attention_heads(self, batches, ratio):
+        """
+        Removes the given fraction of attention heads, least important first.
+        A head's importance is the accumulated magnitude of the loss gradient
+        with respect to a mask over that head (Michel et al., 2019), normalized
+        per layer; every layer keeps at least one head.
+
+        Args:
+            batches: Training batches used to score the heads.
+            ratio (float): Fraction of all heads to remove.
+
+        Returns:
+            dict: Layer index -> list of pruned head indices.
+        """
+        config = self.model.config
+        n_layers, n_heads = config.num_hidden_layers, config.num_attention_heads
+        head_mask = torch.ones(n_layers, n_heads, device=self.device, requires_grad=True)
+        importance = torch.zeros(n_layers, n_heads, device=self.device)
+        # Only the mask needs gradients
+        parameters = [p for p in self.model.parameters() if p.requires_grad]
+        for parameter in parameters:
+            parameter.requires_grad_(False)
         self.model.eval()
+        try:
+            for batch in batches:
+                outputs = self.model(
+                    batch['input_ids'].to(self.device, non_blocking=True),
+                    attention_mask=batch['attention_mask'].to(self.device, non_blocking=True),
+                    labels=batch['labels'].to(self.device, non_blocking=True),
+                    head_mask=head_mask
+                )
+                outputs.loss.backward()
+                importance += head_mask.grad.abs()
+                head_mask.grad = None
+        except Exception as e:
+            logger.warning(f"Could not score BERT attention heads, skipping pruning: {e}")
+            return {}
+        finally:
+            for parameter in parameters:
+                parameter.requires_grad_(True)
+
+        importance /= importance.norm(dim=1, keepdim=True) + 1e-20
+        remaining = int(n_layers * n_heads * ratio)
+        pruned = {}
+        for index in importance.flatten().argsort().tolist():
+            if remaining == 0:
+                break
+            layer, head = divmod(index, n_heads)
+            heads = pruned.setdefault(layer, [])
+            if len(heads) < n_heads - 1:
+                heads.append(head)
+                remaining -= 1
+        pruned = {layer: heads for layer, heads in pruned.items() if heads}
+        if pruned:
+            self.model.prune_heads(pruned)
+            logger.info(f"Pruned {sum(len(heads) for heads in pruned.values())} of {n_layers * n_heads} BERT attention heads.")
+        return pruned
+
+    def save_int8(self):
+        """
+        Saves int8 dynamically quantized weights of the trained model, about a
+        quarter of the float32 size, for CPU inference. load_model uses them
+        instead of quantizing the float32 weights on every start.
+
+        Returns:
+            bool: True if the quantized weights were saved.
+        """
+        path = _int8_path(self.config.MODEL_FILE_PATH)
+        try:
+            quantized = _quantize_int8(copy.deepcopy(self.model).cpu().eval())
+            # Packed int8 parameters are quantized tensors, which safetensors
+            # cannot store; torch.save writes them in a form that load_model
+            # reads back with weights_only=True
+            torch.save(quantized.state_dict(), path)
+            logger.info("BERT int8 weights saved successfully.")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not save int8 BERT weights: {e}")
+            _remove_file(path)
+            return False
+
+    def _create_optimizer(self):
+        """
+        Creates the AdamW optimizer for training. On CUDA this is bitsandbytes'
+        8-bit AdamW when USE_8BIT_OPTIM is set and the package is installed,
+        and otherwise PyTorch's fused AdamW, which updates all parameters in
+        one kernel instead of looping over them.
+        """
+        params = self.model.parameters()
+        lr = self.config.BERT_LEARNING_RATE
+        if self.device.type == 'cuda':
+            if getattr(self.config, 'USE_8BIT_OPTIM', False):
+                try:
+                    import bitsandbytes as bnb
+                    logger.info("Using 8-bit AdamW optimizer.")
+                    return bnb.optim.AdamW8bit(params, lr=lr)
+                except ImportError:
+                    logger.warning("bitsandbytes is not installed; using standard AdamW.")
+            try:
+                return AdamW(params, lr=lr, fused=True)
+            except (TypeError, RuntimeError):
+                # PyTorch < 2.0 has no fused implementation
+                params = self.model.parameters()
+        return AdamW(params, lr=lr)
+
+    def export_torchscript(self):
+        """
+        Traces the trained model, with the same int8/bf16 conversion applied
+        at load time, and saves it next to the weights so later starts can
+        load the optimized graph instead of rebuilding the model in Python.
+
+        Returns:
+            bool: True if the TorchScript model was saved.
+        """
+        if not self.model:
+            return False
+        try:
+            model = self._prepare_for_inference(copy.deepcopy(self.model).eval())
+            example = self.tokenizer(
+                ['hello world', 'warmup'],
+                truncation=True,
+                padding='max_length',
+                max_length=64,
+                return_tensors='pt'
+            )
+            example_inputs = (example['input_ids'].to(self.device), example['attention_mask'].to(self.device))
+            with torch.no_grad():
+                traced = torch.jit.trace(_LogitsModule(model).eval(), example_inputs, check_trace=False)
+                traced = torch.jit.optimize_for_inference(traced)
+            traced.save(_torchscript_path(self.config.MODEL_FILE_PATH))
+            logger.info("BERT TorchScript model saved successfully.")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not export BERT model to TorchScript: {e}")
+            return False
+
+    def _prepare_for_inference(self, model):
+        """Applies the configured int8 quantization or bfloat16 cast to an eval-mode model."""
+        if getattr(self.config, 'QUANTIZE_INT8', False) and self.device.type == 'cpu':
+            # Dynamic int8 quantization of the linear/recurrent layers (CPU only)
+            model = _quantize_int8(model)
+            logger.info("Applied dynamic int8 quantization to BERT linear layers.")
+        elif getattr(self.config, 'USE_BF16', False):
+            # Halve weight and activation width where int8 is not in use
+            model = model.to(dtype=torch.bfloat16)
+            logger.info("Cast BERT model to bfloat16.")
+        return model
+
+    def _load_torchscript(self):
+        """Loads the traced model if one was exported, returning True on success."""
+        ts_path = _torchscript_path(self.config.MODEL_FILE_PATH)
+        if not os.path.exists(ts_path):
+            return False
+        try:
+            self.model = torch.jit.load(ts_path, map_location=self.device)
+            self.model.eval()
+            self.predict_intent(['warmup'])
+            logger.info("BERT TorchScript model loaded successfully.")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not load BERT TorchScript model, loading weights instead: {e}")
+            self.model = None
+            return False
+
+
+    def _load_int8(self, int8_path):
+        """
+        Gives the model the quantized structure and loads the weights saved by
+        save_int8 into it. Like every other artifact, the file is loaded with
+        weights_only=True: the packed parameters are quantized tensors and a
+        dtype, which the restricted unpickler accepts, so no arbitrary object
+        is ever unpickled.
+
+        Returns:
+            bool: False, with the model left unchanged, if the file cannot be
+            loaded that way; the float weights are quantized instead.
+        """
+        try:
+            state_dict = torch.load(int8_path, map_location='cpu', weights_only=True)
+        except pickle.UnpicklingError as e:
+            logger.warning(f"Ignoring int8 BERT weights that cannot be loaded safely: {e}")
+            return False
+        model = _quantize_int8(self.model.eval())
+        model.load_state_dict(state_dict)
+        self.model = model
+        logger.info("Loaded int8 quantized BERT weights.")
+        return True
+
+    def load_model(self):
+        logger.info("Loading BERT model from disk...")
+        try:
+            self.label_map = _load_label_map(self.config.VECTORIZER_FILE_PATH)
+            if self.label_map is None:
+                # Models saved without a label map: rebuild it from the intents
+                intents_dir = getattr(self.config, 'INTENTS_DIR', None)
+                if intents_dir and os.path.isdir(intents_dir):
+                    data = load_all_intents(intents_dir)
+                else:
+                    with open(self.config.DATA_PATH, 'rb') as f:
+                        data = json_utils.loads(f.read())
+                tags = sorted([intent['tag'] for intent in data['intents'] if intent.get('tag') != 'default'])
+                self.label_map = {tag: i for i, tag in enumerate(tags)}
+            self.intents = sorted(self.label_map, key=self.label_map.get)
+
+            if getattr(self.config, 'USE_TORCHSCRIPT', False) and self._load_torchscript():
+                return True
+
+            self.model = BertForSequenceClassification.from_pretrained(
+                self.config.BERT_MODEL_PATH, num_labels=len(self.intents)
+            )
+            _apply_pruned_heads(self.model, self.config.MODEL_FILE_PATH)
+            int8_path = _int8_path(self.config.MODEL_FILE_PATH)
+            use_int8 = getattr(self.config, 'QUANTIZE_INT8', False) and self.device.type == 'cpu'
+            if not (use_int8 and os.path.exists(int8_path) and self._load_int8(int8_path)):
+                state_dict = _load_state_dict(self.config.MODEL_FILE_PATH, self.device)
+                try:
+                    # Use the loaded tensors, already on the target device,
+                    # directly instead of copying them into freshly
+                    # initialized parameters
+                    self.model.load_state_dict(state_dict, assign=True)
+                except TypeError:
+                    # PyTorch < 2.1 has no assign option
+                    self.model.load_state_dict(state_dict)
+                self.model.to(self.device)
+                self.model.eval()
+                self.model = self._prepare_for_inference(self.model)
+            # Run one prediction so quantized kernels are initialized before
+            # the first real request
+            self.predict_intent(['warmup'])
+            logger.info("BERT model loaded successfully.")
+            return True
+        except (FileNotFoundError, pickle.UnpicklingError) as e:
+            logger.error(f"Error loading BERT model files: {e}")
+            return False
+
+    def compile_for_inference(self):
+        """
+        Compiles the loaded model with torch.compile (or TorchScript on older
+        PyTorch) and runs one warmup prediction so the first real request does
+        not pay the tracing cost. Falls back to the eager model on failure.
+
+        Returns:
+            bool: True if a compiled model is now in use.
+        """
+        if not self.model:
+            return False
+        if isinstance(self.model, torch.jit.ScriptModule):
+            logger.info("BERT model is already a TorchScript model; skipping compilation.")
+            return False
+        eager_model = self.model
+        # Reuse kernels compiled by earlier runs; an explicit env setting wins
+        cache_dir = getattr(self.config, 'TORCH_COMPILE_CACHE_DIR', None)
+        if cache_dir:
+            os.environ.setdefault('TORCHINDUCTOR_CACHE_DIR', cache_dir)
+        try:
+            if hasattr(torch, 'compile'):
+                self.model = torch.compile(eager_model, mode='reduce-overhead', dynamic=True)
+            else:
+                self.model = torch.jit.script(eager_model)
+                self.model.eval()
+            self.predict_intent(['warmup'])
+            logger.info("BERT model compiled for inference.")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not compile BERT model, using eager mode: {e}")
+            self.model = eager_model
+            return False
+
+    def share_memory(self):
+        """
+        Moves the model's parameters and buffers into shared memory, so worker
+        processes forked afterwards map the same physical pages instead of
+        copying them as neighbouring heap pages are written.
+
+        Returns:
+            bool: True if the model is now in shared memory.
+        """
+        if not self.model:
+            return False
+        try:
+            self.model.share_memory()
+            logger.info("BERT model weights moved to shared memory.")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not move BERT model to shared memory: {e}")
+            return False
 
     def predict_intent(self, preprocessed_tokens):
-        text = " ".join(preprocessed_tokens)
-        inputs = self.tokenizer(text, return_tensors='pt', truncation=True, padding=True, max_length=64)
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
-        with torch.no_grad():
-            logits = self.model(**inputs).logits
-        prediction = torch.argmax(logits, dim=1).item()
-        return self.intents[prediction]
+        """Predicts the intent of a single input through the batched path."""
+        predicted_intent, max_confidence = self.predict_intent_batch([preprocessed_tokens])[0]
+        if predicted_intent == 'no_match':
+            logger.info(f"Low confidence ({max_confidence:.3f}), below threshold {self.config.CONFIDENCE_THRESHOLD}, returning 'no_match'")
+        return predicted_intent, max_confidence
+
+    def predict_intent_batch(self, batch_tokens):
+        """
+        Predicts intents for several preprocessed inputs with a single forward
+        pass over a padded batch. Returns a list of (intent, confidence).
+        """
+        if not self.model:
+            logger.error("BERT model is not loaded. Cannot predict.")
+            return [('unknown', 0.0)] * len(batch_tokens)
+
+        texts = [" ".join(tokens) for tokens in batch_tokens]
+        results = [('default', 1.0)] * len(texts)
+        indices = [i for i, text in enumerate(texts) if text.strip()]
+        if not indices:
+            return results
+
+        input_ids, attention_mask = self._encode_texts([texts[i] for i in indices])
+
+        with torch.inference_mode():
+            logits = self._logits(input_ids, attention_mask).float()
+            max_logits, predictions = logits.max(dim=1)
+            # Softmax probability of the top class only, without the full
+            # probability matrix
+            max_confidences = torch.exp(logits - max_logits.unsqueeze(1)).sum(dim=1).reciprocal()
+            # Both results come back in one device-to-host copy
+            rows = torch.stack((max_confidences, predictions.float()), dim=1).tolist()
+
+        for i, (max_confidence, prediction) in zip(indices, rows):
+            predicted_intent = self.intents[int(prediction)]
+            logger.info(f"Predicted intent (BERT): '{predicted_intent}' with confidence: {max_confidence:.3f}")
+            if max_confidence < self.config.CONFIDENCE_THRESHOLD:
+                results[i] = ('no_match', max_confidence)
+            else:
+                results[i] = (predicted_intent, max_confidence)
+        return results
+
+    def _encode_text_uncached(self, text):
+        return tuple(self.tokenizer.encode(text, truncation=True, max_length=64))
+
+    def _encode_texts(self, texts):
+        """
+        Tokenizes texts, reusing cached token ids for repeated texts, and pads
+        them to the longest one. The attention mask keeps padding from
+        affecting the predictions.
+
+        Returns:
+            tuple: The input_ids and attention_mask tensors on the model's device.
+        """
+        encoded = [self._encode_text(text) for text in texts]
+        max_length = max(len(ids) for ids in encoded)
+        input_ids = torch.full((len(encoded), max_length), self.tokenizer.pad_token_id or 0, dtype=torch.long)
+        attention_mask = torch.zeros((len(encoded), max_length), dtype=torch.long)
+        for row, ids in enumerate(encoded):
+            input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, :len(ids)] = 1
+        return input_ids.to(self.device), attention_mask.to(self.device)
+
+    def _logits(self, input_ids, attention_mask):
+        # Traced models return the logits tensor directly
+        outputs = self.model(input_ids, attention_mask)
+        return outputs if isinstance(outputs, torch.Tensor) else outputs.logits
+
+    def encode_batch(self, batch_tokens):
+        """
+        Returns mean-pooled sentence embeddings from the BERT encoder as a
+        float32 array of shape (len(batch_tokens), hidden_size).
+        """
+        if not self.model:
+            raise RuntimeError("BERT model is not loaded. Cannot encode.")
+        if isinstance(self.model, torch.jit.ScriptModule):
+            raise RuntimeError("The TorchScript BERT model only provides intent predictions.")
+
+        input_ids, attention_mask = self._encode_texts([" ".join(tokens) for tokens in batch_tokens])
+
+        # The classification head is not needed; run the encoder of the
+        # eager model underneath torch.compile if it was applied.
+        encoder = getattr(self.model, '_orig_mod', self.model).bert
+        with torch.inference_mode():
+            hidden = encoder(input_ids, attention_mask=attention_mask)[0]
+            mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return pooled.float().cpu().numpy()
 
 class IntentDataset(Dataset):
+    """
+    A custom PyTorch Dataset for intent classification. All texts are
+    tokenized once up front in a single batched call, so each epoch only
+    indexes into the tensors. Rows are padded to the longest text rather than
+    the 64 token limit, since intent patterns are usually much shorter.
+    """
     def __init__(self, texts, labels, tokenizer, label_map):
-        self.texts = texts
-        self.labels = [label_map[label] for label in labels]
-        self.tokenizer = tokenizer
+        encoding = tokenizer(
+            list(texts),
+            truncation=True,
+            padding='longest',
+            max_length=64,
+            return_tensors='pt'
+        )
+        self.input_ids = encoding['input_ids']
+        self.attention_mask = encoding['attention_mask']
+        # Map tags to ids in one vectorized lookup against the sorted tags
+        tags = np.array(list(label_map))
+        ids = np.fromiter(label_map.values(), dtype=np.int64, count=len(label_map))
+        order = np.argsort(tags)
+        positions = order[np.searchsorted(tags, np.asarray(labels), sorter=order)]
+        self.labels = torch.from_numpy(ids[positions])
 
     def __len__(self):
-        return len(self.texts)
+        return len(self.labels)
 
     def __getitem__(self, idx):
-        encoding = self.tokenizer(
-            self.texts[idx], truncation=True, padding='max_length', max_length=64, return_tensors='pt'
-        )
         return {
-            'input_ids': encoding['input_ids'].squeeze(),
-            'attention_mask': encoding['attention_mask'].squeeze(),
-            'labels': torch.tensor(self.labels[idx], dtype=torch.long)
+            'input_ids': self.input_ids[idx],
+            'attention_mask': self.attention_mask[idx],
+            'labels': self.labels[idx]
         }
-
@@ -3,43 +3,131 @@
 # model/context_handler.py
 # A simple class to store and retrieve conversation context.
 # ==============================================================================
-from collections import deque
+from collections.abc import Sequence
+
+
+class _ContextView(Sequence):
+    """
+    Live, read-only view of a ContextHandler's turns as (role, text) tuples,
+    oldest first. Indexing reads the ring buffers directly, so nothing is
+    copied; later turns show up in the view.
+    """
+    __slots__ = ('_handler',)
+
+    def __init__(self, handler):
+        self._handler = handler
+
+    def __len__(self):
+        return self._handler._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        handler = self._handler
+        size = handler._size
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("context index out of range")
+        slot = (handler._next - size + index) % handler.window_size
+        return handler._roles[slot], handler._texts[slot]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
 
 class ContextHandler:
     """
     Manages the conversation context for multi-turn dialogue.
+
+    Turns are kept in two fixed-size ring buffers, one for roles and one for
+    texts, so adding a turn stores two references instead of allocating a
+    dict. The context is returned as a view of (role, text) tuples, oldest
+    first.
     """
     def __init__(self, window_size=3):
         """
-        Initializes the context queue.
-        
+        Initializes the context buffers.
+
         Args:
             window_size (int): The number of recent turns to remember.
         """
         self.window_size = window_size
-        self.context = deque(maxlen=window_size)
+        self._roles = [None] * window_size
+        self._texts = [None] * window_size
+        # Slot the next turn is written to, and number of turns held
+        self._next = 0
+        self._size = 0
+        # Number of entries added since the last clear, including those that
+        # have already dropped out of the window
+        self.turns = 0
+        self._view = _ContextView(self)
+
+    def _append(self, role, text):
+        if not self.window_size:
+            return
+        self._roles[self._next] = role
+        self._texts[self._next] = text
+        self._next = (self._next + 1) % self.window_size
+        if self._size < self.window_size:
+            self._size += 1
 
     def add_user_query(self, query):
         """
         Adds a user query to the context.
         """
-        self.context.append({"role": "user", "text": query})
+        self._append("user", query)
+        self.turns += 1
 
     def add_bot_response(self, response):
         """
         Adds a bot response to the context.
         """
-        self.context.append({"role": "bot", "text": response})
+        self._append("bot", response)
+        self.turns += 1
+
+    def restore(self, role, text):
+        """
+        Adds a turn loaded from a saved session. Restored turns are not
+        counted in `turns`, since they are already saved.
+        """
+        self._append(role, text)
 
     def get_context(self):
         """
-        Returns the current conversation context.
+        Returns the current conversation context as a live, read-only sequence
+        of (role, text) tuples, oldest first. It is a view, not a copy, so
+        callers should take list() of it if they need a snapshot that outlives
+        the next turn.
+        """
+        return self._view
+
+    def get_context_since(self, turns):
+        """
+        Returns the entries added after the given turn count that are still
+        within the window.
+        """
+        new = min(self.turns - turns, self._size)
+        if new <= 0:
+            return []
+        size = self.window_size
+        return [(self._roles[i % size], self._texts[i % size]) for i in range(self._next - new, self._next)]
+
+    @staticmethod
+    def as_records(entries):
+        """
+        Converts (role, text) entries to the {"role": ..., "text": ...} dicts
+        stored in session files.
         """
-        return list(self.context)
+        return [{"role": role, "text": text} for role, text in entries]
 
     def clear_context(self):
         """
         Clears the conversation context.
         """
-        self.context.clear()
+        self._roles = [None] * self.window_size
+        self._texts = [None] * self.window_size
+        self._next = 0
+        self._size = 0
+        self.turns = 0
 
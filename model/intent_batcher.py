@@ -0,0 +1,90 @@
+# ==============================================================================
+# model/intent_batcher.py
+# Micro-batching of concurrent intent predictions.
+# ==============================================================================
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class IntentBatcher:
+    """
+    Coalesces intent predictions that arrive within a short window into a
+    single batched classifier call, so concurrent API requests share one
+    forward pass instead of running one each.
+    """
+    def __init__(self, predict_batch_fn, max_batch_size=16, max_wait=0.005):
+        """
+        Args:
+            predict_batch_fn (callable): Takes a list of preprocessed token lists
+                and returns a list of (intent, confidence) tuples.
+            max_batch_size (int): Maximum number of inputs per batch.
+            max_wait (float): Seconds to wait for more inputs after the first one.
+        """
+        self.predict_batch_fn = predict_batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._inflight = 0
+
+    def predict_intent(self, preprocessed_tokens):
+        """
+        Queues a prediction and blocks until its batch has been processed.
+
+        Returns:
+            tuple: The (intent, confidence) for the given tokens.
+        """
+        future = Future()
+        self._submit(preprocessed_tokens, future)
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def _submit(self, preprocessed_tokens, future):
+        # Threads do not survive a fork, so the worker is started lazily in
+        # whichever process first submits work.
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,), daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+                self._inflight = 0
+            self._inflight += 1
+            self._queue.put((preprocessed_tokens, future))
+
+    def _run(self, pending):
+        while True:
+            items = [pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            # Only wait for as many inputs as there are callers waiting, so an
+            # uncontended request is predicted straight away.
+            while len(items) < min(self.max_batch_size, self._inflight):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.predict_batch_fn([tokens for tokens, _ in items])
+            except Exception as e:
+                logger.error(f"Batched prediction failed: {e}")
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(items, results):
+                future.set_result(result)
@@ -2,25 +2,212 @@
 # model/intent_classifier.py
 # Intent classification module with a factory pattern for different models.
 # ==============================================================================
+from collections import Counter
+from functools import lru_cache
+import hashlib
 import pickle
-import json
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.svm import SVC
+from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 import os
 
-import torch
-from torch.utils.data import Dataset, DataLoader
-from transformers import BertTokenizer, BertForSequenceClassification
-from torch.optim import AdamW # Import AdamW directly from PyTorch
-
 from utils.logger import get_logger
 from utils.data_loader import load_all_intents
+from utils import json_utils
+from utils.model_io import dump_pickle, load_pickle
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 logger = get_logger(__name__)
 
+# TF-IDF settings that decide how a text maps to features. The fitted
+# vocabulary and idf weights are saved separately (see _save_vectorizer).
+_TFIDF_PARAMS = {'ngram_range': (1, 2), 'stop_words': 'english'}
+# Classifier settings. Weak regularization keeps confidences usable against
+# CONFIDENCE_THRESHOLD on small intent sets. The fitted coefficients are saved
+# separately (see _save_model).
+_MODEL_PARAMS = {'C': 10.0, 'max_iter': 1000, 'random_state': 42}
+
+
+def _arrays_path(path):
+    """Returns the .npz file holding the arrays of a model artifact path."""
+    return os.path.splitext(path)[0] + '.npz'
+
+
+def _save_vectorizer(vectorizer, path):
+    """
+    Saves a fitted TfidfVectorizer as plain arrays (vocabulary terms, their
+    column ids and the idf weights) instead of pickling the object.
+    """
+    terms = list(vectorizer.vocabulary_)
+    np.savez(
+        _arrays_path(path),
+        terms=np.array(terms),
+        ids=np.fromiter((vectorizer.vocabulary_[term] for term in terms), dtype=np.int32, count=len(terms)),
+        idf=vectorizer.idf_
+    )
+
+
+def _load_vectorizer(path):
+    """
+    Rebuilds the TfidfVectorizer saved by _save_vectorizer without unpickling
+    anything. Vectorizers pickled by earlier versions are loaded when no
+    arrays file exists.
+    """
+    arrays_path = _arrays_path(path)
+    if not os.path.exists(arrays_path):
+        return load_pickle(path)
+    with np.load(arrays_path, allow_pickle=False) as arrays:
+        vectorizer = TfidfVectorizer(
+            vocabulary=dict(zip(arrays['terms'].tolist(), arrays['ids'].tolist())),
+            **_TFIDF_PARAMS
+        )
+        vectorizer.idf_ = arrays['idf']
+    return vectorizer
+
+
+def _accumulate_scores(columns, tfidf, weights, intercept):
+    """Adds each matched feature's weighted class row to the intercepts."""
+    scores = intercept.copy()
+    for i in range(columns.shape[0]):
+        row = columns[i]
+        value = tfidf[i]
+        for c in range(weights.shape[1]):
+            scores[c] += weights[row, c] * value
+    return scores
+
+
+# Compiled to a native loop when numba is installed; otherwise the scorer
+# (and so predict_intent_batch) uses a NumPy gather and matrix product
+# instead of this Python loop
+_accumulate_scores = njit(cache=True)(_accumulate_scores) if njit is not None else None
+
+
+def _training_hash_path(path):
+    """Returns the file recording which training inputs produced a saved model."""
+    return os.path.splitext(path)[0] + '.hash'
+
+
+def _training_digest(vectorizer, model, patterns, labels):
+    """Hashes the unfitted estimators' settings and the training examples."""
+    digest = hashlib.blake2b()
+    digest.update(f"{vectorizer!r}\0{model!r}\0".encode('utf-8'))
+    for pattern, label in zip(patterns, labels):
+        digest.update(f"{label}\0{pattern}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _read_training_hash(path):
+    """Returns the training hash recorded for a saved model, or None."""
+    try:
+        with open(_training_hash_path(path), encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _save_model(model, path):
+    """
+    Saves a fitted LogisticRegression as plain arrays (coefficients,
+    intercepts and class labels); other models are pickled.
+    """
+    if not isinstance(model, LogisticRegression):
+        dump_pickle(model, path)
+        return
+    np.savez(
+        _arrays_path(path),
+        coef=model.coef_,
+        intercept=model.intercept_,
+        classes=np.asarray(model.classes_).astype(str)
+    )
+
+
+def _load_model(path):
+    """
+    Rebuilds the LogisticRegression saved by _save_model for prediction
+    without unpickling anything. Models pickled by earlier versions are
+    loaded when no arrays file exists.
+    """
+    arrays_path = _arrays_path(path)
+    if not os.path.exists(arrays_path):
+        return load_pickle(path)
+    with np.load(arrays_path, allow_pickle=False) as arrays:
+        # Same solver settings as training, so predict_proba uses the same
+        # multinomial (or binary) formulation
+        model = LogisticRegression(**_MODEL_PARAMS)
+        model.coef_ = arrays['coef']
+        model.intercept_ = arrays['intercept']
+        model.classes_ = arrays['classes']
+    model.n_features_in_ = model.coef_.shape[1]
+    return model
+
+
+class _LinearScorer:
+    """
+    Scores a single text against a fitted TF-IDF vectorizer and multinomial
+    LogisticRegression without building a sparse matrix: the text's terms are
+    looked up in the vocabulary and only the matching coefficient rows are
+    combined. Gives the same prediction as predict/predict_proba.
+    """
+    def __init__(self, vectorizer, model):
+        self.analyzer = vectorizer.build_analyzer()
+        self.vocabulary = vectorizer.vocabulary_
+        self.idf = np.asarray(vectorizer.idf_, dtype=np.float32)
+        # One contiguous row of class weights per feature
+        self.weights = np.ascontiguousarray(model.coef_.T, dtype=np.float32)
+        self.intercept = np.asarray(model.intercept_, dtype=np.float32)
+        self.classes = model.classes_
+        if _accumulate_scores is not None and self.weights.shape[0]:
+            # Compile the kernel for these array types now, during model load
+            # and warmup, instead of on the first request of every API worker
+            _accumulate_scores(
+                np.zeros(1, dtype=np.intp), np.zeros(1, dtype=np.float32), self.weights, self.intercept
+            )
+
+    @staticmethod
+    def supports(vectorizer, model):
+        """Returns True if the scorer reproduces this vectorizer/model pair exactly."""
+        return (
+            isinstance(model, LogisticRegression)
+            and len(model.classes_) > 2
+            and model.solver != 'liblinear'
+            and getattr(model, 'multi_class', 'auto') in ('auto', 'multinomial', 'deprecated')
+            and isinstance(vectorizer, TfidfVectorizer)
+            and vectorizer.norm == 'l2'
+            and vectorizer.use_idf
+            and not vectorizer.sublinear_tf
+            and not vectorizer.binary
+        )
+
+    def score(self, text):
+        """Returns the predicted intent and its probability."""
+        counts = Counter()
+        for term in self.analyzer(text):
+            column = self.vocabulary.get(term)
+            if column is not None:
+                counts[column] += 1
+        if counts:
+            columns = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+            tfidf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * self.idf[columns]
+            tfidf /= np.linalg.norm(tfidf)
+            if _accumulate_scores is not None:
+                scores = _accumulate_scores(columns, tfidf, self.weights, self.intercept)
+            else:
+                scores = tfidf @ self.weights[columns] + self.intercept
+        else:
+            scores = self.intercept.copy()
+        # Softmax
+        scores = np.exp(scores - scores.max())
+        scores /= scores.sum()
+        best = int(np.argmax(scores))
+        return self.classes[best], float(scores[best])
+
+
 class IntentClassifier:
     """
     Factory class to create and manage intent classifiers.
@@ -43,6 +230,8 @@ class IntentClassifier:
         if self.model_type == 'svm':
             self.classifier = SVMIntentClassifier(config)
         elif self.model_type == 'bert':
+            # Imported here so SVM-only deployments never load torch/transformers
+            from model.bert_classifier import BertIntentClassifier
             self.classifier = BertIntentClassifier(config)
         else:
             raise ValueError(f"Unknown model type: {self.model_type}")
@@ -51,11 +240,27 @@ class IntentClassifier:
         self.classifier.train_model(data, preprocessor)
 
     def load_model(self):
-        self.classifier.load_model()
+        return self.classifier.load_model()
     
+    def compile_for_inference(self):
+        if hasattr(self.classifier, 'compile_for_inference'):
+            return self.classifier.compile_for_inference()
+        return False
+
+    def share_memory(self):
+        if hasattr(self.classifier, 'share_memory'):
+            return self.classifier.share_memory()
+        return False
+
     def predict_intent(self, preprocessed_tokens):
         return self.classifier.predict_intent(preprocessed_tokens)
 
+    def predict_intent_batch(self, batch_tokens):
+        return self.classifier.predict_intent_batch(batch_tokens)
+
+    def encode_batch(self, batch_tokens):
+        return self.classifier.encode_batch(batch_tokens)
+
 
 class SVMIntentClassifier:
     """
@@ -66,8 +271,17 @@ class SVMIntentClassifier:
         self.model = None
         self.vectorizer = None
         self.intents = []
+        self._reset_score_cache()
         logger.info("SVM intent classifier initialized.")
 
+    def _reset_score_cache(self):
+        # Scores of recently seen texts and the fused scorer; must be rebuilt
+        # whenever the model changes
+        self._score_text = lru_cache(maxsize=getattr(self.config, 'SVM_SCORE_CACHE_SIZE', 1024))(self._score_text_uncached)
+        self._scorer = None
+        if self.model is not None and _LinearScorer.supports(self.vectorizer, self.model):
+            self._scorer = _LinearScorer(self.vectorizer, self.model)
+
     def train_model(self, data, preprocessor):
         logger.info("Starting SVM model training process...")
         patterns = []
@@ -85,16 +299,28 @@ class SVMIntentClassifier:
             logger.error("No training patterns found. Cannot train model.")
             return
 
-        self.intents = sorted(list(set(labels)))
-        
         # Improved TF-IDF vectorizer with better parameters
-        self.vectorizer = TfidfVectorizer(
+        vectorizer = TfidfVectorizer(
             max_features=5000,
-            ngram_range=(1, 2),
             min_df=1,
             max_df=0.95,
-            stop_words='english'
+            **_TFIDF_PARAMS
         )
+        # Linear model with native probabilities: no internal cross-validation
+        # like SVC(probability=True), and a query is scored with one sparse
+        # product.
+        model = LogisticRegression(**_MODEL_PARAMS)
+
+        # Fitting is deterministic, so unchanged inputs would reproduce the
+        # saved model; load it instead
+        training_hash = _training_digest(vectorizer, model, patterns, labels)
+        if training_hash == _read_training_hash(self.config.MODEL_FILE_PATH) and self.load_model():
+            self.intents = sorted(set(labels))
+            logger.info("SVM model is up to date with the training data; skipped training.")
+            return
+
+        self.intents = sorted(list(set(labels)))
+        self.vectorizer = vectorizer
         
         # Use stratified split to ensure all classes are represented
         X_train, X_test, y_train, y_test = train_test_split(
@@ -103,15 +329,9 @@ class SVMIntentClassifier:
         
         X_train_vec = self.vectorizer.fit_transform(X_train)
         
-        # Improved SVM with better parameters
-        self.model = SVC(
-            kernel='rbf',
-            C=1.0,
-            gamma='scale',
-            probability=True,
-            random_state=42
-        )
+        self.model = model
         self.model.fit(X_train_vec, y_train)
+        self._reset_score_cache()
         
         X_test_vec = self.vectorizer.transform(X_test)
         y_pred = self.model.predict(X_test_vec)
@@ -123,10 +343,14 @@ class SVMIntentClassifier:
         try:
             # Ensure models directory exists
             os.makedirs(os.path.dirname(self.config.MODEL_FILE_PATH), exist_ok=True)
-            with open(self.config.MODEL_FILE_PATH, 'wb') as f:
-                pickle.dump(self.model, f)
-            with open(self.config.VECTORIZER_FILE_PATH, 'wb') as f:
-                pickle.dump(self.vectorizer, f)
+            hash_path = _training_hash_path(self.config.MODEL_FILE_PATH)
+            # A partially written model must never be taken as up to date
+            if os.path.exists(hash_path):
+                os.remove(hash_path)
+            _save_model(self.model, self.config.MODEL_FILE_PATH)
+            _save_vectorizer(self.vectorizer, self.config.VECTORIZER_FILE_PATH)
+            with open(hash_path, 'w', encoding='utf-8') as f:
+                f.write(training_hash)
             logger.info("SVM model and vectorizer saved successfully.")
         except Exception as e:
             logger.error(f"Failed to save model files: {e}", exc_info=True)
@@ -134,10 +358,9 @@ class SVMIntentClassifier:
     def load_model(self):
         logger.info("Loading SVM model from disk...")
         try:
-            with open(self.config.MODEL_FILE_PATH, 'rb') as f:
-                self.model = pickle.load(f)
-            with open(self.config.VECTORIZER_FILE_PATH, 'rb') as f:
-                self.vectorizer = pickle.load(f)
+            self.model = _load_model(self.config.MODEL_FILE_PATH)
+            self.vectorizer = _load_vectorizer(self.config.VECTORIZER_FILE_PATH)
+            self._reset_score_cache()
             
             # Load intents from directory to ensure merged set
             intents_dir = getattr(self.config, 'INTENTS_DIR', None)
@@ -145,229 +368,64 @@ class SVMIntentClassifier:
                 data = load_all_intents(intents_dir)
             else:
                 # Fallback to legacy single file
-                with open(self.config.DATA_PATH, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.config.DATA_PATH, 'rb') as f:
+                    data = json_utils.loads(f.read())
             self.intents = sorted([intent['tag'] for intent in data['intents'] if intent.get('tag') != 'default'])
             
             logger.info("SVM model and vectorizer loaded successfully.")
             return True
-        except (FileNotFoundError, pickle.UnpicklingError) as e:
+        except (FileNotFoundError, ValueError, pickle.UnpicklingError) as e:
             logger.error(f"Error loading SVM model files: {e}")
             return False
 
     def predict_intent(self, preprocessed_tokens):
-        if not self.model or not self.vectorizer:
-            logger.error("SVM model is not loaded. Cannot predict.")
-            return 'unknown', 0.0
-        
-        text = " ".join(preprocessed_tokens)
-        if not text.strip():
-            return 'default', 1.0
+        """Predicts the intent of a single input through the batched path."""
+        predicted_intent, max_confidence = self.predict_intent_batch([preprocessed_tokens])[0]
+        if predicted_intent == 'no_match':
+            logger.info(f"Low confidence ({max_confidence:.3f}), below threshold {self.config.CONFIDENCE_THRESHOLD}, returning 'no_match'")
+        return predicted_intent, max_confidence
 
+    def _score_text_uncached(self, text):
+        """Returns the predicted intent and its probability for a preprocessed text."""
+        if self._scorer is not None:
+            return self._scorer.score(text)
         vectorized_text = self.vectorizer.transform([text])
-        
-        # Get prediction and confidence score
         predicted_intent = self.model.predict(vectorized_text)[0]
         confidence_scores = self.model.predict_proba(vectorized_text)[0]
-        max_confidence = float(np.max(confidence_scores))
-        
-        logger.info(f"Predicted intent (SVM): '{predicted_intent}' with confidence: {max_confidence:.3f}")
-        
-        # Use configured confidence threshold for matching
-        if max_confidence < self.config.CONFIDENCE_THRESHOLD:
-            logger.info(f"Low confidence ({max_confidence:.3f}), below threshold {self.config.CONFIDENCE_THRESHOLD}, returning 'no_match'")
-            return 'no_match', max_confidence
-        
-        return predicted_intent, max_confidence
-
-class BertIntentClassifier:
-    """
-    A class for training and predicting intents using a PyTorch and BERT model.
-    """
-    def __init__(self, config):
-        self.config = config
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        self.tokenizer = BertTokenizer.from_pretrained(config.BERT_MODEL_PATH)
-        self.model = None
-        self.label_map = None
-        self.intents = []
-        logger.info(f"BERT intent classifier initialized on device: {self.device}")
-
-    def train_model(self, data, preprocessor):
-        logger.info("Starting BERT model training process...")
-        patterns = []
-        labels = []
-        for intent in data['intents']:
-            # Skip default fallback intent from training/labels
-            if intent.get('tag') == 'default':
-                continue
-            if intent['patterns']:
-                for pattern in intent['patterns']:
-                    patterns.append(pattern) # BERT can handle raw text
-                    labels.append(intent['tag'])
-        
-        if not patterns:
-            logger.error("No training patterns found. Cannot train model.")
-            return
-
-        self.intents = sorted(list(set(labels)))
-        self.label_map = {tag: i for i, tag in enumerate(self.intents)}
-        
-        # Prepare dataset
-        X_train, X_test, y_train, y_test = train_test_split(
-            patterns, labels, test_size=0.2, random_state=42, stratify=labels
-        )
-        
-        train_dataset = IntentDataset(X_train, y_train, self.tokenizer, self.label_map)
-        test_dataset = IntentDataset(X_test, y_test, self.tokenizer, self.label_map)
-        
-        train_loader = DataLoader(train_dataset, batch_size=self.config.BERT_BATCH_SIZE, shuffle=True)
-        
-        # Initialize BERT model
-        self.model = BertForSequenceClassification.from_pretrained(
-            self.config.BERT_MODEL_PATH, num_labels=len(self.intents)
-        )
-        self.model.to(self.device)
-        
-        optimizer = AdamW(self.model.parameters(), lr=self.config.BERT_LEARNING_RATE)
-        
-        # Training loop
-        self.model.train()
-        for epoch in range(self.config.BERT_EPOCHS):
-            for batch in train_loader:
-                optimizer.zero_grad()
-                input_ids = batch['input_ids'].to(self.device)
-                attention_mask = batch['attention_mask'].to(self.device)
-                labels = batch['labels'].to(self.device)
-                
-                outputs = self.model(input_ids, attention_mask=attention_mask, labels=labels)
-                loss = outputs.loss
-                loss.backward()
-                optimizer.step()
-            logger.info(f"Epoch {epoch+1}/{self.config.BERT_EPOCHS}, Loss: {loss.item():.4f}")
-
-        # Evaluation (optional)
-        self.model.eval()
-        true_labels = []
-        predictions = []
-        test_loader = DataLoader(test_dataset, batch_size=self.config.BERT_BATCH_SIZE)
-        with torch.no_grad():
-            for batch in test_loader:
-                input_ids = batch['input_ids'].to(self.device)
-                attention_mask = batch['attention_mask'].to(self.device)
-                labels = batch['labels'].to(self.device)
-                
-                outputs = self.model(input_ids, attention_mask=attention_mask)
-                logits = outputs.logits
-                preds = torch.argmax(logits, dim=1).cpu().numpy()
-                
-                true_labels.extend(labels.cpu().numpy())
-                predictions.extend(preds)
-
-        accuracy = accuracy_score(true_labels, predictions)
-        logger.info(f"BERT Model training complete. Accuracy on test data: {accuracy:.2f}")
-        logger.info("Classification Report:\n" + classification_report(true_labels, predictions, zero_division=0))
-
-        # Save model
-        try:
-            # Ensure models directory exists (BERT folder when MODEL_TYPE=bert)
-            os.makedirs(os.path.dirname(self.config.MODEL_FILE_PATH), exist_ok=True)
-            torch.save(self.model.state_dict(), self.config.MODEL_FILE_PATH)
-            with open(self.config.VECTORIZER_FILE_PATH, 'wb') as f: # Re-using vectorizer path for label_map
-                pickle.dump(self.label_map, f)
-            logger.info("BERT model and label map saved successfully.")
-        except Exception as e:
-            logger.error(f"Failed to save BERT model files: {e}", exc_info=True)
-
-
-    def load_model(self):
-        logger.info("Loading BERT model from disk...")
-        try:
-            intents_dir = getattr(self.config, 'INTENTS_DIR', None)
-            if intents_dir and os.path.isdir(intents_dir):
-                data = load_all_intents(intents_dir)
+        return predicted_intent, float(np.max(confidence_scores))
+
+    def predict_intent_batch(self, batch_tokens):
+        """
+        Predicts intents for several preprocessed inputs. Scores of recently
+        seen texts are reused; only the other texts are scored, with the fused
+        scorer when the model supports it. Returns a list of (intent,
+        confidence).
+        """
+        if not self.model or not self.vectorizer:
+            logger.error("SVM model is not loaded. Cannot predict.")
+            return [('unknown', 0.0)] * len(batch_tokens)
+
+        texts = [" ".join(tokens) for tokens in batch_tokens]
+        results = [('default', 1.0)] * len(texts)
+        indices = [i for i, text in enumerate(texts) if text.strip()]
+
+        # API batches are small, so scoring texts one by one (and skipping
+        # cached ones) beats building a sparse matrix for them
+        for i in indices:
+            predicted_intent, max_confidence = self._score_text(texts[i])
+            logger.info(f"Predicted intent (SVM): '{predicted_intent}' with confidence: {max_confidence:.3f}")
+            if max_confidence < self.config.CONFIDENCE_THRESHOLD:
+                results[i] = ('no_match', max_confidence)
             else:
-                with open(self.config.DATA_PATH, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            self.intents = sorted([intent['tag'] for intent in data['intents'] if intent.get('tag') != 'default'])
-            self.label_map = {tag: i for i, tag in enumerate(self.intents)}
-
-            self.model = BertForSequenceClassification.from_pretrained(
-                self.config.BERT_MODEL_PATH, num_labels=len(self.intents)
-            )
-            self.model.load_state_dict(torch.load(self.config.MODEL_FILE_PATH))
-            self.model.to(self.device)
-            self.model.eval()
-            logger.info("BERT model loaded successfully.")
-            return True
-        except (FileNotFoundError, pickle.UnpicklingError) as e:
-            logger.error(f"Error loading BERT model files: {e}")
-            return False
-
-    def predict_intent(self, preprocessed_tokens):
-        if not self.model:
-            logger.error("BERT model is not loaded. Cannot predict.")
-            return 'unknown', 0.0
-        
-        text = " ".join(preprocessed_tokens)
-        if not text.strip():
-            return 'default', 1.0
-
-        encoding = self.tokenizer.encode_plus(
-            text,
-            truncation=True,
-            padding='max_length',
-            max_length=64,
-            return_tensors='pt'
-        )
-        
-        input_ids = encoding['input_ids'].to(self.device)
-        attention_mask = encoding['attention_mask'].to(self.device)
-        
-        with torch.no_grad():
-            outputs = self.model(input_ids, attention_mask=attention_mask)
-            logits = outputs.logits
-
-        probabilities = torch.softmax(logits, dim=1)
-        max_confidence, prediction = torch.max(probabilities, dim=1)
-        max_confidence = max_confidence.item()
-        prediction = prediction.item()
-
-        predicted_intent = self.intents[prediction]
-        logger.info(f"Predicted intent (BERT): '{predicted_intent}' with confidence: {max_confidence:.3f}")
-
-        if max_confidence < self.config.CONFIDENCE_THRESHOLD:
-            logger.info(f"Low confidence ({max_confidence:.3f}), below threshold {self.config.CONFIDENCE_THRESHOLD}, returning 'no_match'")
-            return 'no_match', max_confidence
-
-        return predicted_intent, max_confidence
-
-class IntentDataset(Dataset):
-    """
-    A custom PyTorch Dataset for intent classification.
-    """
-    def __init__(self, texts, labels, tokenizer, label_map):
-        self.texts = texts
-        self.labels = [label_map[label] for label in labels]
-        self.tokenizer = tokenizer
-
-    def __len__(self):
-        return len(self.texts)
-
-    def __getitem__(self, idx):
-        text = self.texts[idx]
-        label = self.labels[idx]
-        
-        encoding = self.tokenizer.encode_plus(
-            text,
-            truncation=True,
-            padding='max_length',
-            max_length=64,
-            return_tensors='pt'
-        )
-        
-        return {
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'labels': torch.tensor(label, dtype=torch.long)
-        }
+                results[i] = (predicted_intent, max_confidence)
+        return results
+
+    def encode_batch(self, batch_tokens):
+        """
+        Returns the TF-IDF vectors of several preprocessed inputs as a dense
+        float32 array of shape (len(batch_tokens), n_features).
+        """
+        if not self.vectorizer:
+            raise RuntimeError("SVM model is not loaded. Cannot encode.")
+        texts = [" ".join(tokens) for tokens in batch_tokens]
+        return self.vectorizer.transform(texts).toarray().astype(np.float32)
@@ -0,0 +1,80 @@
+# ==============================================================================
+# model/pattern_index.py
+# Nearest-neighbour lookup of inputs against the training patterns.
+# ==============================================================================
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class PatternIndex:
+    """
+    Holds normalized embeddings of every training pattern so an input the
+    classifier is unsure about can be matched to its most similar known
+    pattern with a single matrix-vector product.
+    """
+    def __init__(self, embeddings, tags):
+        """
+        Args:
+            embeddings (np.ndarray): One embedding per pattern, shape (n, dim).
+            tags (list): The intent tag of each pattern, in the same order.
+        """
+        self.matrix = self._normalize(np.ascontiguousarray(embeddings, dtype=np.float32))
+        self.tags = tags
+
+    @classmethod
+    def build(cls, classifier, preprocessor, data, batch_size=16):
+        """
+        Encodes all training patterns with the classifier.
+
+        Args:
+            classifier (IntentClassifier): A loaded classifier providing encode_batch.
+            preprocessor (TextPreprocessor): Used to preprocess each pattern.
+            data (dict): The intents data.
+            batch_size (int): Number of patterns encoded per call.
+
+        Returns:
+            PatternIndex: The index, or None if there are no patterns.
+        """
+        patterns = []
+        tags = []
+        for intent in data.get('intents', []):
+            if intent.get('tag') == 'default':
+                continue
+            for pattern in intent.get('patterns', []):
+                tokens = preprocessor.preprocess(pattern)
+                if tokens:
+                    patterns.append(tokens)
+                    tags.append(intent['tag'])
+        if not patterns:
+            return None
+
+        embeddings = np.concatenate([
+            classifier.encode_batch(patterns[start:start + batch_size])
+            for start in range(0, len(patterns), batch_size)
+        ])
+        logger.info(f"Built pattern index with {len(tags)} training patterns.")
+        return cls(embeddings, tags)
+
+    def match(self, embedding):
+        """
+        Finds the training pattern most similar to an input.
+
+        Args:
+            embedding (np.ndarray): The input's embedding, shape (dim,).
+
+        Returns:
+            tuple: The (intent, cosine similarity) of the closest pattern.
+        """
+        query = self._normalize(np.asarray(embedding, dtype=np.float32).reshape(1, -1))[0]
+        similarities = self.matrix @ query
+        best = int(np.argmax(similarities))
+        return self.tags[best], float(similarities[best])
+
+    @staticmethod
+    def _normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        # All-zero rows (e.g. no known TF-IDF terms) stay zero
+        norms[norms == 0] = 1.0
+        return matrix / norms
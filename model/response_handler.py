@@ -2,15 +2,23 @@
 # model/response_handler.py
 # A class for handling chatbot responses.
 # ==============================================================================
+import asyncio
+import concurrent.futures
 import random
 import json
 import os
+import threading
 import requests # assuming requests is available
 
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Tags answered by the fallback instead of a local response
+_UNMATCHED_TAGS = frozenset({'unknown', 'no_match'})
+# Tags never answered from the local response map
+_NON_LOCAL_TAGS = _UNMATCHED_TAGS | {'default'}
+
 class ResponseHandler:
     """
     A class to handle the generation of chatbot responses based on intents.
@@ -27,12 +35,24 @@ class ResponseHandler:
         self.intents = data['intents']
         # Store default responses separately and exclude from main response map
         default_intent = next((i for i in self.intents if i.get('tag') == 'default'), None)
-        self.default_responses = (default_intent or {}).get('responses', ["I'm not sure what to say."])
+        self.default_responses = tuple((default_intent or {}).get('responses') or ["I'm not sure what to say."])
+        # Responses are stored once as immutable tuples. Tags that are never
+        # answered from local responses, and intents without any responses,
+        # are left out, so a single lookup in get_response settles the common case
         self.response_map = {
-            intent['tag']: intent.get('responses', [])
+            intent['tag']: tuple(intent['responses'])
             for intent in self.intents
-            if intent.get('tag') != 'default'
+            if intent.get('tag') not in _NON_LOCAL_TAGS and intent.get('responses')
+        }
+        # Fallback used for low-confidence and unmatched input, keyed on ENABLE_GOOGLE_FALLBACK
+        self._fallback_handlers = {
+            True: self.google_fallback,
+            False: lambda context: random.choice(self.default_responses),
         }
+        # Event loop for Google fallback searches, run on a background thread
+        self._loop = None
+        self._loop_pid = None
+        self._loop_lock = threading.Lock()
         logger.info("Response handler initialized with rules-based responses.")
 
     def get_response(self, intent_tag, confidence, context):
@@ -42,7 +62,7 @@ class ResponseHandler:
         Args:
             intent_tag (str): The predicted intent tag from the classifier.
             confidence (float): The confidence score of the prediction.
-            context (list): A list of recent queries and responses.
+            context (list): Recent (role, text) turns, oldest first.
             
         Returns:
             str: A randomly selected response string.
@@ -53,12 +73,10 @@ class ResponseHandler:
         if confidence < self.config.CONFIDENCE_THRESHOLD:
             logger.info(f"Confidence {confidence:.2f} below threshold {self.config.CONFIDENCE_THRESHOLD}")
             # Log the low confidence query for model improvement
-            query = context[-1]['text'] if context else "unknown_query"
+            query = context[-1][1] if context else "unknown_query"
             self._log_unmatched_query(f"Low confidence ({confidence:.2f}): {query}")
             # Use Google fallback if enabled, otherwise use default response
-            if self.config.ENABLE_GOOGLE_FALLBACK:
-                return self.google_fallback(context)
-            return random.choice(self.default_responses)
+            return self._fallback(context)
         
         # ----- Hooks for advanced generation (future) -----
         if self.config.ENABLE_GENERATIVE_RESPONSE:
@@ -67,29 +85,26 @@ class ResponseHandler:
             # Example using a placeholder function:
             # return self._generate_llm_response(intent_tag, context)
             pass
-        
-        if intent_tag in ("unknown", "no_match"):
-            logger.warning(f"Unknown intent detected. Logging query for retraining.")
-            self._log_unmatched_query(context[-1]['text'] if context else "unknown_query")
-            if self.config.ENABLE_GOOGLE_FALLBACK:
-                logger.info("Unknown intent, falling back to Google Search.")
-                return self.google_fallback(context)
-            else:
-                return random.choice(self.default_responses)
-        
-        # Handle explicit default tag without warning
-        if intent_tag == 'default':
-            return random.choice(self.default_responses)
 
         responses = self.response_map.get(intent_tag)
-        if responses:
+        if responses is not None:
+            response = random.choice(responses)
             logger.info({
                 'event': 'response_source',
                 'source': 'local',
                 'intent_tag': intent_tag,
-                'response': responses
+                'response': response
             })
-            return random.choice(responses)
+            return response
+
+        if intent_tag in _UNMATCHED_TAGS:
+            logger.warning(f"Unknown intent detected. Logging query for retraining.")
+            self._log_unmatched_query(context[-1][1] if context else "unknown_query")
+            return self._fallback(context)
+        
+        # Handle explicit default tag without warning
+        if intent_tag == 'default':
+            return random.choice(self.default_responses)
 
         # If no local response, fallback to Google
         if self.config.ENABLE_GOOGLE_FALLBACK:
@@ -102,18 +117,22 @@ class ResponseHandler:
         })
         return random.choice(self.default_responses)
 
+    def _fallback(self, context):
+        """Answers input without a usable intent via Google search or a default response."""
+        return self._fallback_handlers[bool(self.config.ENABLE_GOOGLE_FALLBACK)](context)
+
     def google_fallback(self, context):
         """Performs a Google search and returns the results, with a confirmation message."""
         logger.info({
             'event': 'response_source',
             'source': 'google_fallback'
         })
-        user_query = context[-1]['text'] if context else ""
-        import asyncio
-        from utils.web_search import query_google
-        loop = asyncio.get_event_loop()
+        user_query = context[-1][1] if context else ""
+        future = asyncio.run_coroutine_threadsafe(
+            self._get_google_results_with_retry(user_query), self._get_event_loop()
+        )
         try:
-            google_results = loop.run_until_complete(self._get_google_results_with_retry(user_query))
+            google_results = future.result(timeout=getattr(self.config, 'GOOGLE_FALLBACK_TIMEOUT', 10))
             structured_response = self._merge_google_results(user_query, google_results)
             logger.info({
                 'event': 'google_fallback_response',
@@ -122,6 +141,14 @@ class ResponseHandler:
             })
             confirmation = "(This answer was sourced from Google Search because no matching intent was found.)"
             return f"{structured_response}\n\n{confirmation}"
+        except concurrent.futures.TimeoutError:
+            # Stop the search so it does not keep running on the shared loop
+            future.cancel()
+            logger.error({
+                'event': 'google_fallback_timeout',
+                'query': user_query
+            })
+            return random.choice(self.default_responses)
         except Exception as e:
             logger.error({
                 'event': 'google_fallback_error',
@@ -130,6 +157,21 @@ class ResponseHandler:
             })
             return random.choice(self.default_responses)
 
+    def _get_event_loop(self):
+        """
+        Returns the shared event loop for fallback searches. get_response is
+        called from API handler and worker threads that have no event loop of
+        their own, so concurrent searches are awaited together on this one.
+        """
+        # Threads do not survive a fork, so the loop is started lazily in
+        # whichever process first needs it.
+        with self._loop_lock:
+            if self._loop_pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+                self._loop_pid = os.getpid()
+            return self._loop
+
     async def _get_google_results_with_retry(self, query, retries=2):
         for attempt in range(retries + 1):
             try:
@@ -137,7 +179,6 @@ class ResponseHandler:
                 return await query_google(query)
             except Exception as e:
                 logger.warning(f"Google search attempt {attempt+1} failed: {e}")
-                import asyncio
                 await asyncio.sleep(1)
         raise Exception("All Google search attempts failed.")
 
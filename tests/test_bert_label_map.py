@@ -0,0 +1,42 @@
+import sys
+import os
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip('torch')
+pytest.importorskip('transformers')
+
+from utils import json_utils
+from model.bert_classifier import _label_map_path, _load_label_map
+
+@pytest.fixture
+def vectorizer_path(tmp_path):
+    """Pytest fixture with the BERT artifact path the label map is stored next to."""
+    return str(tmp_path / 'bert' / 'vectorizer.pkl')
+
+def test_label_map_path(vectorizer_path):
+    """Test that the label map is stored as label_map.json beside the model files."""
+    assert _label_map_path(vectorizer_path) == os.path.join(os.path.dirname(vectorizer_path), 'label_map.json')
+
+def test_load_label_map(vectorizer_path):
+    """Test that a saved label map loads back with its ids, in id order."""
+    label_map = {"weather": 0, "greeting": 1, "goodbye": 2}
+    os.makedirs(os.path.dirname(vectorizer_path))
+    with open(_label_map_path(vectorizer_path), 'wb') as f:
+        f.write(json_utils.dumps_bytes(label_map))
+    loaded = _load_label_map(vectorizer_path)
+    assert loaded == label_map
+    assert sorted(loaded, key=loaded.get) == ["weather", "greeting", "goodbye"]
+
+def test_load_label_map_missing(vectorizer_path):
+    """Test that a model saved without a label map returns None."""
+    assert _load_label_map(vectorizer_path) is None
+
+def test_load_label_map_invalid(vectorizer_path):
+    """Test that an unreadable label map is ignored."""
+    os.makedirs(os.path.dirname(vectorizer_path))
+    with open(_label_map_path(vectorizer_path), 'wb') as f:
+        f.write(b'{"weather": ')
+    assert _load_label_map(vectorizer_path) is None
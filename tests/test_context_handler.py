@@ -0,0 +1,100 @@
+import sys
+import os
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model.context_handler import ContextHandler
+
+@pytest.fixture
+def context():
+    """Pytest fixture to create a ContextHandler with a three-turn window."""
+    return ContextHandler(window_size=3)
+
+def test_context_oldest_first(context):
+    """Test that turns are returned oldest first with their roles."""
+    context.add_user_query("hi")
+    context.add_bot_response("hello")
+    assert list(context.get_context()) == [("user", "hi"), ("bot", "hello")]
+    assert context.turns == 2
+
+def test_context_wraparound(context):
+    """Test that only the last window_size turns are kept once the buffer wraps."""
+    for i in range(7):
+        context.add_user_query(f"q{i}")
+    assert list(context.get_context()) == [("user", "q4"), ("user", "q5"), ("user", "q6")]
+    assert context.turns == 7
+
+def test_context_is_live_view(context):
+    """Test that get_context returns the same live view rather than a copy."""
+    view = context.get_context()
+    assert not view
+    context.add_user_query("hi")
+    context.add_bot_response("hello")
+    assert view is context.get_context()
+    assert len(view) == 2
+    assert view[-1] == ("bot", "hello")
+    assert view[0] == ("user", "hi")
+    with pytest.raises(IndexError):
+        view[2]
+
+def test_context_view_after_wraparound(context):
+    """Test indexing the view once the ring buffer has wrapped."""
+    for i in range(5):
+        context.add_user_query(f"q{i}")
+    view = context.get_context()
+    assert view[-1] == ("user", "q4")
+    assert view[0] == ("user", "q2")
+    assert view[1:] == [("user", "q3"), ("user", "q4")]
+
+def test_context_since(context):
+    """Test that get_context_since returns only the turns added after a count."""
+    context.add_user_query("q0")
+    context.add_bot_response("r0")
+    saved = context.turns
+    context.add_user_query("q1")
+    assert context.get_context_since(saved) == [("user", "q1")]
+    assert context.get_context_since(context.turns) == []
+
+def test_context_since_after_wraparound(context):
+    """Test that get_context_since is limited to the turns still in the window."""
+    context.add_user_query("q0")
+    saved = context.turns
+    for i in range(1, 6):
+        context.add_user_query(f"q{i}")
+    assert context.get_context_since(saved) == [("user", "q3"), ("user", "q4"), ("user", "q5")]
+    # More turns were added than the window holds, so the caller cannot append these
+    assert context.turns - saved > len(context.get_context())
+
+def test_restored_turns_not_returned_since(context):
+    """Test that restored turns are not returned as unsaved."""
+    context.restore("user", "saved")
+    assert context.get_context_since(0) == []
+
+def test_restore_not_counted(context):
+    """Test that restored turns are kept but not counted as new."""
+    context.restore("user", "saved")
+    assert list(context.get_context()) == [("user", "saved")]
+    assert context.turns == 0
+
+def test_clear_context(context):
+    """Test that clearing empties the window and resets the turn count."""
+    for i in range(4):
+        context.add_user_query(f"q{i}")
+    context.clear_context()
+    assert list(context.get_context()) == []
+    assert context.turns == 0
+    context.add_bot_response("again")
+    assert list(context.get_context()) == [("bot", "again")]
+
+def test_zero_window():
+    """Test that a zero-size window keeps nothing but still counts turns."""
+    context = ContextHandler(window_size=0)
+    context.add_user_query("hi")
+    assert list(context.get_context()) == []
+    assert context.turns == 1
+
+def test_as_records():
+    """Test conversion of entries to session file records."""
+    assert ContextHandler.as_records([("user", "hi")]) == [{"role": "user", "text": "hi"}]
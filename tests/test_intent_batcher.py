@@ -0,0 +1,91 @@
+import sys
+import os
+import threading
+import time
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model.intent_batcher import IntentBatcher
+
+class RecordingPredictor:
+    """Predicts each input's first token as its intent and records the batches."""
+    def __init__(self):
+        self.batches = []
+        # Cleared to hold the first batch until more requests have queued
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, batch):
+        self.batches.append(list(batch))
+        self.release.wait(5)
+        return [(tokens[0], 1.0) for tokens in batch]
+
+def test_single_prediction():
+    """Test that an uncontended request is predicted without waiting for max_wait."""
+    predictor = RecordingPredictor()
+    batcher = IntentBatcher(predictor, max_batch_size=8, max_wait=5.0)
+    start = time.monotonic()
+    assert batcher.predict_intent(['greeting']) == ('greeting', 1.0)
+    assert time.monotonic() - start < 1.0
+    assert predictor.batches == [[['greeting']]]
+
+def test_concurrent_predictions_are_batched():
+    """Test that requests queued while a batch runs are predicted together."""
+    predictor = RecordingPredictor()
+    predictor.release.clear()
+    batcher = IntentBatcher(predictor, max_batch_size=8, max_wait=1.0)
+    results = {}
+
+    def request(tag):
+        results[tag] = batcher.predict_intent([tag])
+
+    threads = [threading.Thread(target=request, args=(f"tag{i}",)) for i in range(4)]
+    threads[0].start()
+    # Hold the first batch until the other three requests are waiting
+    deadline = time.monotonic() + 5
+    while not predictor.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    for thread in threads[1:]:
+        thread.start()
+    while batcher._inflight < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    predictor.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == {f"tag{i}": (f"tag{i}", 1.0) for i in range(4)}
+    assert [len(batch) for batch in predictor.batches] == [1, 3]
+
+def test_max_batch_size():
+    """Test that no batch is larger than max_batch_size."""
+    predictor = RecordingPredictor()
+    predictor.release.clear()
+    batcher = IntentBatcher(predictor, max_batch_size=2, max_wait=1.0)
+    threads = [threading.Thread(target=batcher.predict_intent, args=([f"tag{i}"],)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while batcher._inflight < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    predictor.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert sum(len(batch) for batch in predictor.batches) == 5
+    assert max(len(batch) for batch in predictor.batches) <= 2
+
+def test_exception_propagates_to_waiters():
+    """Test that a failed batch raises in every waiting caller and the batcher keeps working."""
+    calls = []
+
+    def predict(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise ValueError("model failure")
+        return [('ok', 0.9)] * len(batch)
+
+    batcher = IntentBatcher(predict, max_batch_size=8, max_wait=0.01)
+    with pytest.raises(ValueError, match="model failure"):
+        batcher.predict_intent(['hello'])
+    assert batcher.predict_intent(['hello']) == ('ok', 0.9)
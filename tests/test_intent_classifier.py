@@ -0,0 +1,135 @@
+import sys
+import os
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip('sklearn')
+
+from utils import json_utils
+from model import intent_classifier
+from model.intent_classifier import SVMIntentClassifier, _LinearScorer
+
+INTENTS = {"intents": [
+    {"tag": "greeting", "patterns": [
+        "hello", "hello there", "hey", "hey there", "good morning", "morning friend",
+        "greetings", "hiya", "howdy", "hello friend"
+    ], "responses": ["Hello!"]},
+    {"tag": "goodbye", "patterns": [
+        "goodbye", "bye", "bye bye", "see ya later", "later friend", "farewell",
+        "catch ya later", "goodbye friend", "good night", "farewell friend"
+    ], "responses": ["Goodbye!"]},
+    {"tag": "weather", "patterns": [
+        "weather today", "rain tomorrow", "sunny outside", "forecast please", "weather forecast",
+        "rain forecast", "cold outside", "hot today", "snow tomorrow", "temperature outside"
+    ], "responses": ["Looks sunny."]},
+    {"tag": "default", "patterns": [], "responses": ["Sorry?"]},
+]}
+
+class SplitPreprocessor:
+    """Lowercases and splits on whitespace, standing in for the NLTK pipeline."""
+    def preprocess(self, text):
+        return text.lower().split()
+
+class MockConfig:
+    """A mock config class for testing purposes."""
+    def __init__(self, models_dir, intents_dir):
+        self.MODEL_FILE_PATH = os.path.join(models_dir, 'intent_classifier.pkl')
+        self.VECTORIZER_FILE_PATH = os.path.join(models_dir, 'vectorizer.pkl')
+        self.INTENTS_DIR = intents_dir
+        self.CONFIDENCE_THRESHOLD = 0.0
+        self.SVM_SCORE_CACHE_SIZE = 16
+
+@pytest.fixture
+def config(tmp_path):
+    """Pytest fixture with model paths and an intents directory in a temporary directory."""
+    intents_dir = tmp_path / 'intents'
+    intents_dir.mkdir()
+    (intents_dir / 'intents.json').write_bytes(json_utils.dumps_bytes(INTENTS))
+    return MockConfig(str(tmp_path / 'svm'), str(intents_dir))
+
+@pytest.fixture
+def trained(config):
+    """Pytest fixture that trains and saves a classifier."""
+    classifier = SVMIntentClassifier(config)
+    classifier.train_model(INTENTS, SplitPreprocessor())
+    return classifier
+
+QUERIES = [["hello", "friend"], ["bye"], ["rain", "today"], ["unseen", "words"], []]
+
+def test_save_load_round_trip(config, trained):
+    """Test that a model saved as arrays loads back with the same predictions."""
+    models_dir = os.path.dirname(config.MODEL_FILE_PATH)
+    files = os.listdir(models_dir)
+    assert {'intent_classifier.npz', 'vectorizer.npz'} <= set(files)
+    assert not [name for name in files if name.endswith('.pkl')]
+
+    loaded = SVMIntentClassifier(config)
+    assert loaded.load_model()
+    assert loaded.intents == ['goodbye', 'greeting', 'weather']
+    expected = trained.predict_intent_batch(QUERIES)
+    for (intent, confidence), (expected_intent, expected_confidence) in zip(loaded.predict_intent_batch(QUERIES), expected):
+        assert intent == expected_intent
+        assert confidence == pytest.approx(expected_confidence, abs=1e-5)
+
+def test_training_skipped_when_unchanged(config, trained, monkeypatch):
+    """Test that retraining on unchanged data loads the saved model instead of fitting."""
+    def fail(*args, **kwargs):
+        raise AssertionError("model was refitted")
+
+    monkeypatch.setattr(intent_classifier.LogisticRegression, 'fit', fail)
+    classifier = SVMIntentClassifier(config)
+    classifier.train_model(INTENTS, SplitPreprocessor())
+    assert classifier.model is not None
+    assert classifier.predict_intent(['hello'])[0] == 'greeting'
+
+def test_training_runs_when_changed(config, trained, monkeypatch):
+    """Test that changed training data is fitted again and the hash is updated."""
+    old_hash = intent_classifier._read_training_hash(config.MODEL_FILE_PATH)
+    fits = []
+    fit = intent_classifier.LogisticRegression.fit
+
+    def counting_fit(self, *args, **kwargs):
+        fits.append(1)
+        return fit(self, *args, **kwargs)
+
+    monkeypatch.setattr(intent_classifier.LogisticRegression, 'fit', counting_fit)
+    changed = {"intents": [dict(intent) for intent in INTENTS['intents']]}
+    changed['intents'][0]['patterns'] = changed['intents'][0]['patterns'] + ["yo"]
+    SVMIntentClassifier(config).train_model(changed, SplitPreprocessor())
+    assert fits == [1]
+    assert intent_classifier._read_training_hash(config.MODEL_FILE_PATH) != old_hash
+
+def test_score_cache(trained):
+    """Test that repeated texts in later batches are served from the score cache."""
+    first = trained.predict_intent_batch(QUERIES)
+    assert trained.predict_intent_batch(QUERIES) == first
+    info = trained._score_text.cache_info()
+    # The empty input is answered without scoring
+    assert info.misses == len(QUERIES) - 1
+    assert info.hits == len(QUERIES) - 1
+
+def test_low_confidence_is_no_match(trained):
+    """Test that predictions below CONFIDENCE_THRESHOLD are returned as 'no_match'."""
+    trained.config.CONFIDENCE_THRESHOLD = 1.0
+    intent, confidence = trained.predict_intent(['hello'])
+    assert intent == 'no_match'
+    assert confidence < 1.0
+
+def test_scorer_matches_sklearn(trained):
+    """Test that the fused scorer gives the same intent and probability as scikit-learn."""
+    assert _LinearScorer.supports(trained.vectorizer, trained.model)
+    scorer = _LinearScorer(trained.vectorizer, trained.model)
+    for tokens in QUERIES[:-1]:
+        text = " ".join(tokens)
+        probabilities = trained.model.predict_proba(trained.vectorizer.transform([text]))[0]
+        intent, confidence = scorer.score(text)
+        assert intent == trained.model.classes_[probabilities.argmax()]
+        assert confidence == pytest.approx(probabilities.max(), abs=1e-5)
+
+def test_predict_intent_matches_batch(trained):
+    """Test that single predictions go through the batched path."""
+    batch = trained.predict_intent_batch(QUERIES)
+    assert [trained.predict_intent(tokens) for tokens in QUERIES] == batch
+    assert batch[-1] == ('default', 1.0)
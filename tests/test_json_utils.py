@@ -0,0 +1,58 @@
+import sys
+import os
+import io
+import json
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import json_utils
+
+DOCUMENT = {"intents": [{"tag": "greeting", "patterns": ["hi", "héllo"], "weight": 0.5}]}
+
+@pytest.fixture(params=['fast', 'stdlib'])
+def backend(request, monkeypatch):
+    """Runs a test with orjson/ijson when installed and again with the stdlib fallbacks."""
+    if request.param == 'stdlib':
+        monkeypatch.setattr(json_utils, 'orjson', None)
+        monkeypatch.setattr(json_utils, 'ijson', None)
+    elif json_utils.orjson is None and json_utils.ijson is None:
+        pytest.skip("orjson and ijson are not installed")
+    return request.param
+
+def test_round_trip(backend):
+    """Test that dumps_bytes/loads round-trip a document."""
+    data = json_utils.dumps_bytes(DOCUMENT)
+    assert isinstance(data, bytes)
+    assert json_utils.loads(data) == DOCUMENT
+    assert json_utils.loads(json_utils.dumps(DOCUMENT)) == DOCUMENT
+
+def test_indent(backend):
+    """Test that indent=True pretty-prints with two spaces."""
+    text = json_utils.dumps(DOCUMENT, indent=True)
+    assert '\n  "intents"' in text
+    assert json.loads(text) == DOCUMENT
+
+def test_loads_invalid(backend):
+    """Test that invalid documents raise json.JSONDecodeError on either backend."""
+    with pytest.raises(json.JSONDecodeError):
+        json_utils.loads(b'{"tag": ')
+
+def test_dumps_unsupported_by_orjson(backend):
+    """Test that values orjson rejects fall back to the stdlib encoder."""
+    big = 2 ** 70
+    assert json_utils.loads(json_utils.dumps_bytes({"n": big})) == {"n": big}
+
+def test_iter_array(backend):
+    """Test streaming the items of a top-level array."""
+    items = [{"role": "user", "text": "hi"}, {"role": "bot", "text": "hello", "score": 0.25}]
+    f = io.BytesIO(json_utils.dumps_bytes(items))
+    result = list(json_utils.iter_array(f))
+    assert result == items
+    assert isinstance(result[1]["score"], float)
+
+def test_iter_object_items(backend):
+    """Test streaming the items of a top-level object."""
+    f = io.BytesIO(json_utils.dumps_bytes({"alice": {"limit": 1.5}, "bob": {"limit": 2}}))
+    assert dict(json_utils.iter_object_items(f)) == {"alice": {"limit": 1.5}, "bob": {"limit": 2}}
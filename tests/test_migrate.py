@@ -0,0 +1,124 @@
+import sys
+import os
+import sqlite3
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import migrate
+
+LATEST = max(m[0] for m in migrate.MIGRATIONS)
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    """Points migrate at a database in a temporary directory."""
+    db_file = str(tmp_path / 'data' / 'chatbot.db')
+    monkeypatch.setattr(migrate, 'DB_FILE', db_file)
+    monkeypatch.setattr(migrate, 'VERSION_FILE', str(tmp_path / 'data' / '.db_version'))
+    monkeypatch.setattr(migrate, 'BACKUP_FILE', db_file + '.bak')
+    monkeypatch.setattr(migrate, '_conn', None)
+    yield db_file
+    migrate.close_db()
+
+@pytest.fixture
+def legacy_db(db_file):
+    """Creates a database with the schema from before migration 001, holding one key and one session."""
+    os.makedirs(os.path.dirname(db_file), exist_ok=True)
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("""
+            CREATE TABLE api_keys (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key_hash TEXT NOT NULL,
+                user_id TEXT NOT NULL UNIQUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP,
+                rate_limit_per_minute INTEGER DEFAULT 60,
+                rate_limit_per_day INTEGER DEFAULT 1000
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE api_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                api_key TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                request_data TEXT,
+                response_data TEXT
+            )
+        """)
+        conn.execute("INSERT INTO api_keys (key_hash, user_id) VALUES ('hash', 'alice')")
+        conn.execute("INSERT INTO api_sessions (api_key, user_id) VALUES ('key', 'alice')")
+    conn.close()
+    return db_file
+
+def columns(table):
+    return {row['name'] for row in migrate.get_db_connection().execute(f"PRAGMA table_info({table})")}
+
+def versions():
+    return [row['version'] for row in migrate.get_db_connection().execute("SELECT version FROM db_version ORDER BY version")]
+
+def test_fresh_database_is_squashed(db_file):
+    """Test that a new database gets the final schema and a single squashed version row."""
+    assert migrate.run_migrations()
+    assert versions() == [LATEST]
+    assert {'api_key', 'key_hash'} <= columns('api_keys')
+    assert {'client_ip', 'endpoint'} <= columns('api_sessions')
+    with open(migrate.VERSION_FILE, encoding='utf-8') as f:
+        assert f.read() == str(LATEST)
+    # Nothing to undo, so no backup is taken
+    assert not os.path.exists(migrate.BACKUP_FILE)
+
+def test_legacy_database_is_migrated(legacy_db):
+    """Test that each migration runs on an old database and existing rows are kept."""
+    assert migrate.run_migrations()
+    assert versions() == [m[0] for m in sorted(migrate.MIGRATIONS)]
+    assert 'api_key' in columns('api_keys')
+    assert {'client_ip', 'endpoint'} <= columns('api_sessions')
+    conn = migrate.get_db_connection()
+    assert conn.execute("SELECT user_id FROM api_keys").fetchone()['user_id'] == 'alice'
+    assert conn.execute("SELECT COUNT(*) AS n FROM api_sessions").fetchone()['n'] == 1
+    assert os.path.exists(migrate.BACKUP_FILE)
+
+def test_target_version(legacy_db):
+    """Test that migrations stop at the target version."""
+    assert migrate.run_migrations(target_version=1)
+    assert versions() == [1]
+    assert 'client_ip' not in columns('api_sessions')
+
+def test_up_to_date_skips_database(db_file, monkeypatch):
+    """Test that an up-to-date version file answers without opening the database."""
+    assert migrate.run_migrations()
+    migrate.close_db()
+
+    def fail():
+        raise AssertionError("database opened")
+
+    monkeypatch.setattr(migrate, '_open', fail)
+    assert migrate.run_migrations()
+
+def test_failed_migration_restores_backup(legacy_db, monkeypatch):
+    """Test that a failing migration rolls back the whole run from the backup."""
+    def broken(conn, schema):
+        conn.execute("ALTER TABLE api_keys ADD COLUMN broken TEXT")
+        return False
+
+    monkeypatch.setattr(migrate, 'MIGRATIONS', migrate.MIGRATIONS + [(LATEST + 1, "Broken", broken)])
+    assert not migrate.run_migrations()
+    assert migrate.get_current_version() == 0
+    assert 'api_key' not in columns('api_keys')
+    assert 'broken' not in columns('api_keys')
+    conn = migrate.get_db_connection()
+    assert conn.execute("SELECT user_id FROM api_keys").fetchone()['user_id'] == 'alice'
+
+def test_backup_and_restore(db_file):
+    """Test that _restore_database brings back the state saved by _backup_database."""
+    migrate.initialize_database()
+    conn = migrate.get_db_connection()
+    conn.execute("INSERT INTO api_keys (key_hash, user_id) VALUES ('hash', 'alice')")
+    conn.commit()
+    migrate._backup_database(conn)
+    conn.execute("DELETE FROM api_keys")
+    conn.commit()
+    migrate._restore_database(conn)
+    assert [row['user_id'] for row in conn.execute("SELECT user_id FROM api_keys")] == ['alice']
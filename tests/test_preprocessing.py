@@ -56,3 +56,10 @@ def test_preprocess_punctuation_only(preprocessor):
     expected = []
     result = preprocessor.preprocess(text)
     assert result == expected
+
+def test_preprocess_repeated_tokens_lemmatized(preprocessor):
+    """Test that memoized lemmas match across repeated calls."""
+    text = "The cats chased other cats."
+    expected = ['cat', 'chased', 'cat']
+    assert preprocessor.preprocess(text) == expected
+    assert preprocessor.preprocess(text) == expected
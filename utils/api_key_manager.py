@@ -2,7 +2,7 @@ import secrets
 import sqlite3
 from datetime import datetime, timedelta
 import hashlib
-from .database import get_db_connection
+from .database import get_db_connection, pooled_connection
 
 class APIKeyManager:
     def __init__(self):
@@ -45,21 +45,21 @@ class APIKeyManager:
             raise
 
     def verify_api_key(self, api_key: str) -> str | None:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT key_hash, user_id, expires_at FROM api_keys")
-            rows = cursor.fetchall()
+        # Hash the provided API key
+        hashed_input = hashlib.sha256(api_key.encode()).hexdigest()
 
-            # Hash the provided API key
-            hashed_input = hashlib.sha256(api_key.encode()).hexdigest()
+        # Called on every API request, so reuse pooled connections and let
+        # SQLite find the matching key instead of scanning all rows here
+        with pooled_connection() as conn:
+            rows = conn.execute(
+                "SELECT user_id, expires_at FROM api_keys WHERE key_hash = ?",
+                (hashed_input,)
+            ).fetchall()
 
-            for row in rows:
-                # Convert sqlite3.Row to dict for safer access
-                row_dict = dict(row)
-                if hashed_input == row_dict['key_hash']:
-                    expires_at = datetime.fromisoformat(row_dict['expires_at'])
-                    if expires_at > datetime.now():
-                        return row_dict['user_id']
+        for row in rows:
+            expires_at = datetime.fromisoformat(row['expires_at'])
+            if expires_at > datetime.now():
+                return row['user_id']
         return None
 
     def get_rate_limits(self, user_id: str) -> dict | None:
@@ -1,14 +1,61 @@
 """Data loading utilities for the chatbot."""
 import os
 import json
+import hashlib
 from typing import Dict, List
 import logging
 
+from utils import json_utils
+
 logger = logging.getLogger(__name__)
 
+# Merged intents are cached here, inside the intents directory, together with
+# the names, sizes and modification times of the files they were built from
+# and a hash of their contents
+INTENTS_CACHE_FILE = '.intents_cache'
+
+# Merged intents already loaded by this process, per directory, together with
+# the names, sizes and modification times of the files they came from
+_loaded_intents = {}
+
+
+def _read_intents_cache(cache_path: str):
+    """Returns the cache document ('signature', 'hash' and 'data'), or None."""
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = json_utils.loads(f.read())
+        if isinstance(cached, dict) and 'data' in cached:
+            return cached
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable intents cache: {e}")
+    return None
+
+
+def _write_intents_cache(cache_path: str, signature: List, digest: str, data: Dict):
+    """Atomically replaces the intents cache; failures only cost the next load."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(json_utils.dumps_bytes({'signature': signature, 'hash': digest, 'data': data}))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write intents cache: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
 def load_all_intents(intents_dir: str) -> Dict:
     """
-    Load and merge all JSON files from the intents directory.
+    Load and merge all JSON files from the intents directory. The merged
+    result is cached alongside the files. The cache is used without reading
+    the files while their names, sizes and modification times are unchanged,
+    and after checking a hash of their contents otherwise. Within a process,
+    repeated loads of an unmodified directory return the same object without
+    reading any file, so callers must treat the result as read-only.
     
     Args:
         intents_dir (str): Path to the directory containing intent JSON files
@@ -20,31 +67,76 @@ def load_all_intents(intents_dir: str) -> Dict:
     
     try:
         # Ensure we load other.json last so its default intent is available
-        json_files = [f for f in os.listdir(intents_dir) if f.endswith('.json')]
+        with os.scandir(intents_dir) as entries:
+            json_stats = {e.name: e.stat() for e in entries if e.name.endswith('.json') and e.is_file()}
+        signature = tuple(sorted((name, st.st_mtime_ns, st.st_size) for name, st in json_stats.items()))
+        memo_key = os.path.abspath(intents_dir)
+        loaded = _loaded_intents.get(memo_key)
+        if loaded is not None and loaded[0] == signature:
+            return loaded[1]
+
+        cache_path = os.path.join(intents_dir, INTENTS_CACHE_FILE)
+        cached = _read_intents_cache(cache_path)
+        # Stored as JSON, so the signature comes back as a list of lists
+        cache_signature = [list(entry) for entry in signature]
+        if cached is not None and cached.get('signature') == cache_signature:
+            data = cached['data']
+            logger.info(f"Loaded {len(data.get('intents', []))} intents from cache")
+            _loaded_intents[memo_key] = (signature, data)
+            return data
+
+        json_files = list(json_stats)
         if 'other.json' in json_files:
             json_files.remove('other.json')
             json_files.append('other.json')
-        
+
+        # Hash names and contents together so renames and reordering also
+        # invalidate the cache
+        contents = {}
+        digest = hashlib.blake2b()
         for filename in json_files:
-            filepath = os.path.join(intents_dir, filename)
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Accept multiple formats:
-                    # 1) { "intents": [ ... ] }
-                    # 2) Single intent object { "tag": ..., "responses": [...] }
-                    # 3) List of intent objects [ {"tag":...}, ... ]
-                    if isinstance(data, dict) and 'intents' in data and isinstance(data['intents'], list):
-                        all_intents['intents'].extend(data['intents'])
-                        logger.info(f"Loaded intents from {filename}")
-                    elif isinstance(data, dict) and data.get('tag') and data.get('responses'):
-                        all_intents['intents'].append(data)
-                        logger.info(f"Loaded single intent from {filename}: {data.get('tag')}")
-                    elif isinstance(data, list):
-                        all_intents['intents'].extend([i for i in data if isinstance(i, dict) and i.get('tag')])
-                        logger.info(f"Loaded {len(data)} intents from list in {filename}")
-                    else:
-                        logger.warning(f"Unrecognized intent format in {filename}")
+                with open(os.path.join(intents_dir, filename), 'rb') as f:
+                    contents[filename] = f.read()
+            except OSError as e:
+                logger.error(f"Error loading {filename}: {str(e)}")
+                continue
+            digest.update(filename.encode('utf-8') + b'\0')
+            digest.update(hashlib.blake2b(contents[filename]).digest())
+        digest = digest.hexdigest()
+
+        if cached is not None and cached.get('hash') == digest:
+            # Same contents with new timestamps (e.g. a fresh checkout); record
+            # the new signature so the next load skips reading the files
+            data = cached['data']
+            logger.info(f"Loaded {len(data.get('intents', []))} intents from cache")
+            _write_intents_cache(cache_path, cache_signature, digest, data)
+            _loaded_intents[memo_key] = (signature, data)
+            return data
+        # Stale; not needed while the files are parsed
+        cached = None
+
+        # Release each file's bytes once parsed, so the raw and parsed copies
+        # of the whole directory are never held at the same time
+        for filename in list(contents):
+            raw = contents.pop(filename)
+            try:
+                data = json_utils.loads(raw)
+                # Accept multiple formats:
+                # 1) { "intents": [ ... ] }
+                # 2) Single intent object { "tag": ..., "responses": [...] }
+                # 3) List of intent objects [ {"tag":...}, ... ]
+                if isinstance(data, dict) and 'intents' in data and isinstance(data['intents'], list):
+                    all_intents['intents'].extend(data['intents'])
+                    logger.info(f"Loaded intents from {filename}")
+                elif isinstance(data, dict) and data.get('tag') and data.get('responses'):
+                    all_intents['intents'].append(data)
+                    logger.info(f"Loaded single intent from {filename}: {data.get('tag')}")
+                elif isinstance(data, list):
+                    all_intents['intents'].extend([i for i in data if isinstance(i, dict) and i.get('tag')])
+                    logger.info(f"Loaded {len(data)} intents from list in {filename}")
+                else:
+                    logger.warning(f"Unrecognized intent format in {filename}")
             except json.JSONDecodeError:
                 logger.error(f"Error decoding JSON from {filename}")
             except Exception as e:
@@ -61,7 +153,9 @@ def load_all_intents(intents_dir: str) -> Dict:
                 "responses": ["I'm not sure how to respond to that."]
             }
             all_intents['intents'].append(default_intent)
-        
+
+        _write_intents_cache(cache_path, cache_signature, digest, all_intents)
+        _loaded_intents[memo_key] = (signature, all_intents)
         return all_intents
     
     except Exception as e:
@@ -3,19 +3,90 @@ Database connection management module.
 """
 import sqlite3
 import os
+import queue
+from contextlib import contextmanager
 from datetime import datetime
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 DB_FILE = os.path.join('data', 'chatbot.db')
 os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
+# Compiled statements kept per connection (sqlite3's default is 128), so the
+# parameterized queries reused on long-lived and pooled connections are only
+# parsed and planned once
+STATEMENT_CACHE_SIZE = 256
 
-def get_db_connection():
-    """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_FILE)
+def configure_connection(conn, synchronous='NORMAL'):
+    """
+    Applies the connection settings used throughout the application.
+
+    Write-ahead logging lets commits append without blocking readers, so with
+    synchronous=NORMAL fsyncs only happen at checkpoints. Temporary tables and
+    a larger page cache stay in memory, reads go through a memory map, and
+    busy connections wait for locks instead of failing immediately.
+
+    Args:
+        conn (sqlite3.Connection): A freshly opened connection.
+        synchronous (str): SQLite synchronous level. 'OFF' skips fsyncs
+            entirely and is only meant for bulk loads that can be rerun.
+
+    Returns:
+        sqlite3.Connection: The same connection.
+    """
     conn.row_factory = sqlite3.Row
+    conn.executescript(
+        "PRAGMA journal_mode=WAL;"
+        f"PRAGMA synchronous={synchronous};"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-20000;"
+        "PRAGMA mmap_size=134217728;"
+        "PRAGMA busy_timeout=5000;"
+        "PRAGMA foreign_keys=ON;"
+    )
     return conn
 
+def get_db_connection():
+    """Establishes a connection to the SQLite database."""
+    return configure_connection(sqlite3.connect(DB_FILE, cached_statements=STATEMENT_CACHE_SIZE))
+
+def get_wal_connection():
+    """
+    Opens a connection for a long-lived writer. Every connection now uses
+    write-ahead logging (see configure_connection); this is kept for callers
+    that hold a connection open for their lifetime.
+    """
+    return get_db_connection()
+
+_POOL_SIZE = 8
+_pool = queue.LifoQueue(maxsize=_POOL_SIZE)
+_pool_pid = os.getpid()
+
+@contextmanager
+def pooled_connection():
+    """
+    Yields a connection from a small pool of reusable connections, for short
+    reads on hot paths that would otherwise open a new connection per call.
+    Connections are returned to the pool afterwards, or closed if it is full.
+    """
+    global _pool, _pool_pid
+    # SQLite connections must not be shared with forked children
+    if _pool_pid != os.getpid():
+        _pool = queue.LifoQueue(maxsize=_POOL_SIZE)
+        _pool_pid = os.getpid()
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = configure_connection(sqlite3.connect(DB_FILE, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE))
+    try:
+        yield conn
+    except Exception:
+        conn.close()
+        raise
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
 # Ensure database exists
 if not os.path.exists(DB_FILE):
     logger.info("Database file not found. Please run migrate.py to initialize the database.")
@@ -0,0 +1,88 @@
+"""
+Fast JSON helpers. Uses orjson when it is installed and falls back to the
+standard library json module otherwise. Arrays are streamed with ijson when
+it is available.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def dumps_bytes(obj, indent=False) -> bytes:
+    """
+    Serializes an object to UTF-8 encoded JSON.
+
+    Args:
+        obj: The object to serialize.
+        indent (bool): Pretty-print with two-space indentation.
+
+    Returns:
+        bytes: The encoded JSON document.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass  # Types orjson does not handle natively; use the stdlib encoder
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+def dumps(obj, indent=False) -> str:
+    """Serializes an object to a JSON string."""
+    return dumps_bytes(obj, indent).decode('utf-8')
+
+
+def loads(data):
+    """
+    Parses a JSON document.
+
+    Args:
+        data (bytes | str): The JSON document.
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_array(f):
+    """
+    Iterates over the items of a top-level JSON array. With ijson installed
+    the items are parsed incrementally, so the whole document is never held
+    in memory at once.
+
+    Args:
+        f: A file object opened in binary mode.
+
+    Returns:
+        iterator: The array items.
+    """
+    if ijson is not None:
+        return ijson.items(f, 'item', use_float=True)
+    return iter(loads(f.read()))
+
+
+def iter_object_items(f):
+    """
+    Iterates over the (key, value) pairs of a top-level JSON object,
+    incrementally when ijson is installed.
+
+    Args:
+        f: A file object opened in binary mode.
+
+    Returns:
+        iterator: The object's items.
+    """
+    if ijson is not None:
+        return ijson.kvitems(f, '', use_float=True)
+    return iter(loads(f.read()).items())
@@ -0,0 +1,18 @@
+"""
+Helpers for reading and writing model artifacts.
+"""
+import mmap
+import pickle
+
+
+def dump_pickle(obj, path):
+    """Pickles an object to disk using the highest available protocol."""
+    with open(path, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_pickle(path):
+    """Unpickles an object from a read-only memory map of the file."""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return pickle.loads(mm)
@@ -4,6 +4,7 @@
 # ==============================================================================
 import nltk
 import string
+from functools import lru_cache
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
@@ -42,6 +43,9 @@ class TextPreprocessor:
     def __init__(self, config):
         self.config = config
         self.lemmatizer = WordNetLemmatizer()
+        # The per-token steps are pure functions of the token and the options,
+        # and user vocabulary is small, so each token is normalized only once
+        self._normalize_token = lru_cache(maxsize=getattr(config, 'TOKEN_CACHE_SIZE', 50000))(self._normalize_token_uncached)
         self.stop_words = set(stopwords.words('english'))
         if self.config.USE_STOPWORD_REMOVAL and self.config.CUSTOM_STOPWORDS:
             self.stop_words.update(self.config.CUSTOM_STOPWORDS)
@@ -51,13 +55,22 @@ class TextPreprocessor:
         return word_tokenize(text)
 
     def preprocess(self, text):
-        tokens = self.tokenize(text)
-        tokens = [token.lower() for token in tokens if token not in string.punctuation]
-            
-        if self.config.USE_STOPWORD_REMOVAL:
-            tokens = [token for token in tokens if token not in self.stop_words]
-            
-        if self.config.USE_LEMMATIZATION:
-            tokens = [self.lemmatizer.lemmatize(token) for token in tokens]
-            
+        remove_stopwords = self.config.USE_STOPWORD_REMOVAL
+        lemmatize = self.config.USE_LEMMATIZATION
+        tokens = []
+        for token in self.tokenize(text):
+            token = self._normalize_token(token, remove_stopwords, lemmatize)
+            if token is not None:
+                tokens.append(token)
         return tokens
+
+    def _normalize_token_uncached(self, token, remove_stopwords, lemmatize):
+        """Returns the normalized token, or None if it is dropped."""
+        if token in string.punctuation:
+            return None
+        token = token.lower()
+        if remove_stopwords and token in self.stop_words:
+            return None
+        if lemmatize:
+            token = self.lemmatizer.lemmatize(token)
+        return token